@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import serialization
+
+PRODUCTS = 50
+ORDERS = 50          # one admin orders page
+ITEMS_PER_ORDER = 3
+NUMBER = 2000        # encodings per timing run
+REPEAT = 5
+
+def legacy_json_serial(obj):
+    """The old server.py hook, kept here as the baseline."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError("Type %s not serializable" % type(obj))
+
+def legacy_dumps(data):
+    return json.dumps(data, default=legacy_json_serial).encode('utf-8')
+
+def stdlib_dumps(data):
+    return serialization._encoder.encode(data).encode('utf-8')
+
+def orjson_dumps(data):
+    return serialization.orjson.dumps(data, default=serialization._default)
+
+def product_rows(price):
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    return [{
+        "id": n,
+        "name": f"Vetaris Formül {n}",
+        "price": price(f"{100 + n * 7.5:.2f}"),
+        "image": f"/images/product-{n}.png",
+        "description": "Eklem sağlığı ve hareketlilik için özel formül. Glukozamin ve kondroitin içerir. " * 2,
+        "category": "Takviye",
+        "stock": 100 + n,
+        "is_active": True,
+        "created_at": now - timedelta(days=n),
+    } for n in range(1, PRODUCTS + 1)]
+
+def order_page(price):
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    orders = []
+    for n in range(1, ORDERS + 1):
+        items = [{
+            "id": n * 10 + k,
+            "order_id": n,
+            "product_id": k,
+            "product_name": f"Vetaris Formül {k}",
+            "quantity": k,
+            "price_at_purchase": price(f"{100 + k * 7.5:.2f}"),
+        } for k in range(1, ITEMS_PER_ORDER + 1)]
+        orders.append({
+            "id": n,
+            "user_id": 1000 + n,
+            "total_amount": price(f"{sum(float(i['price_at_purchase']) * i['quantity'] for i in items):.2f}"),
+            "status": "Hazırlanıyor",
+            "created_at": now - timedelta(minutes=n),
+            "user_email": f"user{n}@vetaris.com",
+            "items": items,
+        })
+    return {"orders": orders, "next_cursor": "MjAyNi0wMS0wMVQxMTo1MDowMHw0MA", "total": 12345}
+
+def best_us(fn, data):
+    return min(timeit.repeat(lambda: fn(data), number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+def run_benchmark():
+    print(f"--- JSON encoding: {PRODUCTS} products, {ORDERS} orders x {ITEMS_PER_ORDER} items ---")
+    print(f"orjson: {'installed' if serialization.orjson else 'not installed'}")
+    payloads = [
+        ("products", product_rows(Decimal), product_rows(float)),
+        ("orders page", order_page(Decimal), order_page(float)),
+    ]
+    for label, decimal_rows, float_rows in payloads:
+        expected = json.loads(legacy_dumps(decimal_rows))
+        approaches = [
+            ("legacy json.dumps + default hook", legacy_dumps, decimal_rows),
+            ("prebuilt encoder, Decimal rows", stdlib_dumps, decimal_rows),
+            ("prebuilt encoder, NUMERIC as float", stdlib_dumps, float_rows),
+        ]
+        if serialization.orjson:
+            approaches += [
+                ("orjson, Decimal rows", orjson_dumps, decimal_rows),
+                ("orjson, NUMERIC as float", orjson_dumps, float_rows),
+            ]
+        pre_encoded = serialization.dumps(float_rows)
+        approaches.append(("pre-encoded bytes (catalog cache)", serialization.dumps, pre_encoded))
+
+        print(f"\n{label} ({len(legacy_dumps(decimal_rows))} bytes)")
+        baseline = None
+        for name, fn, data in approaches:
+            assert json.loads(fn(data)) == expected, name
+            us = best_us(fn, data)
+            baseline = baseline or us
+            print(f"  {name:<36} {us:>9.1f} us  {baseline / us:>6.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
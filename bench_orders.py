@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import database
+
+BENCH_EMAIL = "bench_orders@vetaris.local"
+ORDER_COUNTS = [10, 100, 1000, 5000]
+ITEMS_PER_ORDER = 3
+RUNS = 5
+
+QUERY_COUNT = [0]
+
+class CountingCursor(database.RealDictCursor):
+    def execute(self, query, vars=None):
+        QUERY_COUNT[0] += 1
+        return super().execute(query, vars)
+
+# database.py looks RealDictCursor up at call time, so this counts its queries too
+database.RealDictCursor = CountingCursor
+
+def legacy_get_user_orders(user_id):
+    """The old N+1 implementation, kept here as the baseline."""
+    with database.db_connection() as conn:
+        cur = conn.cursor(cursor_factory=CountingCursor)
+        cur.execute("SELECT * FROM orders WHERE user_id = %s ORDER BY created_at DESC", (user_id,))
+        orders = cur.fetchall()
+        for order in orders:
+            cur.execute("SELECT * FROM order_items WHERE order_id = %s", (order['id'],))
+            order['items'] = cur.fetchall()
+        cur.close()
+    return orders
+
+def setup_user():
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM users WHERE email = %s", (BENCH_EMAIL,))
+        row = cur.fetchone()
+        if row:
+            user_id = row[0]
+        else:
+            cur.execute(
+                "INSERT INTO users (email, password_hash) VALUES (%s, 'x') RETURNING id",
+                (BENCH_EMAIL,)
+            )
+            user_id = cur.fetchone()[0]
+        conn.commit()
+        cur.close()
+    return user_id
+
+def clear_orders(user_id):
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE user_id = %s)", (user_id,))
+        cur.execute("DELETE FROM orders WHERE user_id = %s", (user_id,))
+        conn.commit()
+        cur.close()
+
+def fill_orders(user_id, count):
+    clear_orders(user_id)
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            WITH o AS (
+                INSERT INTO orders (user_id, total_amount)
+                SELECT %s, 100 FROM generate_series(1, %s)
+                RETURNING id
+            )
+            INSERT INTO order_items (order_id, product_id, product_name, quantity, price_at_purchase)
+            SELECT o.id, n, 'Bench Product ' || n, 1, 10
+            FROM o CROSS JOIN generate_series(1, %s) AS n
+        """, (user_id, count, ITEMS_PER_ORDER))
+        conn.commit()
+        cur.close()
+
+def measure(fn, user_id):
+    best = None
+    for _ in range(RUNS):
+        QUERY_COUNT[0] = 0
+        started = time.perf_counter()
+        orders = fn(user_id)
+        elapsed = time.perf_counter() - started
+        queries = QUERY_COUNT[0]
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, queries, len(orders)
+
+def run_benchmark():
+    print("--- get_user_orders: N+1 vs batched ---")
+    user_id = setup_user()
+    print(f"{'orders':>8} | {'legacy q':>8} {'legacy ms':>10} | {'batched q':>9} {'batched ms':>10} | {'speedup':>7}")
+    try:
+        for count in ORDER_COUNTS:
+            fill_orders(user_id, count)
+            legacy_t, legacy_q, n1 = measure(legacy_get_user_orders, user_id)
+            new_t, new_q, n2 = measure(database.get_user_orders, user_id)
+            assert n1 == n2 == count, (n1, n2, count)
+            print(f"{count:>8} | {legacy_q:>8} {legacy_t * 1000:>10.1f} | {new_q:>9} {new_t * 1000:>10.1f} | {legacy_t / new_t:>6.1f}x")
+    finally:
+        clear_orders(user_id)
+
+if __name__ == "__main__":
+    run_benchmark()
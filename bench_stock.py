@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import threading
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import database
+
+BENCH_EMAIL = "bench_stock@vetaris.local"
+THREADS = int(os.getenv("BENCH_THREADS", "16"))
+STOCK = int(os.getenv("BENCH_STOCK", "500"))
+
+def setup():
+    """Bench user plus two throwaway SKUs."""
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM users WHERE email = %s", (BENCH_EMAIL,))
+        row = cur.fetchone()
+        if row:
+            user_id = row[0]
+        else:
+            cur.execute(
+                "INSERT INTO users (email, password_hash) VALUES (%s, 'x') RETURNING id",
+                (BENCH_EMAIL,)
+            )
+            user_id = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO products (name, price, category, stock, is_active)
+            VALUES ('Bench SKU A', 10, 'bench', 0, TRUE), ('Bench SKU B', 20, 'bench', 0, TRUE)
+            RETURNING id
+        """)
+        skus = [r[0] for r in cur.fetchall()]
+        conn.commit()
+        cur.close()
+    return user_id, skus
+
+def cleanup(user_id, skus):
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE user_id = %s)", (user_id,))
+        cur.execute("DELETE FROM orders WHERE user_id = %s", (user_id,))
+        cur.execute("DELETE FROM products WHERE id = ANY(%s)", (skus,))
+        conn.commit()
+        cur.close()
+
+def set_stock(skus, stock):
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("UPDATE products SET stock = %s WHERE id = ANY(%s)", (stock, skus))
+        cur.execute("DELETE FROM order_items WHERE product_id = ANY(%s)", (skus,))
+        conn.commit()
+        cur.close()
+
+def sold_and_left(sku):
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT COALESCE(SUM(quantity), 0) FROM order_items WHERE product_id = %s", (sku,))
+        sold = cur.fetchone()[0]
+        cur.execute("SELECT stock FROM products WHERE id = %s", (sku,))
+        left = cur.fetchone()[0]
+        cur.close()
+    return sold, left
+
+def buyer(user_id, make_cart, results):
+    ok = sold_out = errors = 0
+    while True:
+        try:
+            database.create_order(user_id, make_cart())
+            ok += 1
+        except database.InsufficientStock:
+            sold_out += 1
+            if sold_out >= 3:
+                break
+        except Exception:
+            errors += 1  # deadlocks etc. would show up here
+    results.append((ok, sold_out, errors))
+
+def run_phase(title, user_id, skus, make_cart):
+    set_stock(skus, STOCK)
+    results = []
+    threads = [threading.Thread(target=buyer, args=(user_id, make_cart, results)) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    orders = sum(r[0] for r in results)
+    errors = sum(r[2] for r in results)
+    print(f"\n{title}")
+    print(f"  {orders} orders in {elapsed:.2f}s ({orders / elapsed:.0f} orders/s), {errors} errors")
+    oversold = False
+    for sku in skus:
+        sold, left = sold_and_left(sku)
+        status = "✅" if sold + left == STOCK and left >= 0 else "❌"
+        oversold = oversold or status == "❌"
+        print(f"  {status} SKU {sku}: sold {sold}, left {left}, started with {STOCK}")
+    return not oversold and errors == 0
+
+def run_benchmark():
+    print(f"--- Stock reservation: {THREADS} threads, {STOCK} units per SKU ---")
+    user_id, skus = setup()
+    try:
+        passed = run_phase(
+            "1 SKU, 1 unit per order (flash sale):", user_id, skus[:1],
+            lambda: [{"product_id": skus[0], "quantity": 1}]
+        )
+        # Both SKUs in random order and quantities: exercises lock ordering
+        passed = run_phase(
+            "2 SKUs per order, shuffled lines:", user_id, skus,
+            lambda: random.sample([
+                {"product_id": skus[0], "quantity": random.randint(1, 3)},
+                {"product_id": skus[1], "quantity": random.randint(1, 3)},
+            ], 2)
+        ) and passed
+    finally:
+        cleanup(user_id, skus)
+    print("\n✅ No oversell, no errors" if passed else "\n❌ Oversell or errors detected")
+    return passed
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark() else 1)
@@ -0,0 +1,71 @@
+import sys
+import os
+import gzip
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import static_files
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public')
+
+def is_fresh(source, target):
+    return os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source)
+
+def write_variant(source, target, data):
+    tmp = target + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    # Keep the source mtime so the server can tell the sibling is up to date
+    st = os.stat(source)
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, target)
+
+def build_assets(force=False):
+    print("🔧 Precompressing static assets in public/ ...")
+    if brotli is None:
+        print("ℹ️ brotli module not installed, writing .gz only")
+
+    built = skipped = 0
+    saved = 0
+    for dirpath, _, filenames in os.walk(PUBLIC_DIR):
+        for name in filenames:
+            source = os.path.join(dirpath, name)
+            if name.endswith(('.gz', '.br', '.tmp')) or not static_files.is_compressible_path(source):
+                continue
+            if os.path.getsize(source) < static_files.COMPRESS_MIN_SIZE:
+                continue
+
+            with open(source, 'rb') as f:
+                raw = f.read()
+
+            variants = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', lambda data: brotli.compress(data, quality=11)))
+
+            for suffix, compress in variants:
+                target = source + suffix
+                if not force and is_fresh(source, target):
+                    skipped += 1
+                    continue
+                data = compress(raw)
+                if len(data) >= len(raw):
+                    # Not worth it; make sure a stale sibling doesn't linger
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                write_variant(source, target, data)
+                built += 1
+                saved += len(raw) - len(data)
+                rel = os.path.relpath(target, PUBLIC_DIR)
+                print(f"✅ {rel}: {len(raw)} -> {len(data)} bytes")
+
+    print(f"Done. {built} written, {skipped} up to date, {saved / 1024:.1f} KB saved per full download.")
+
+if __name__ == "__main__":
+    build_assets(force='--force' in sys.argv)
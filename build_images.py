@@ -0,0 +1,121 @@
+import sys
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import database
+import images
+from static_files import StaticFiles
+
+PUBLIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public')
+OUT_DIR = os.path.join(PUBLIC_DIR, *images.DERIVED_DIR.split('/'))
+MANIFEST_PATH = os.path.join(OUT_DIR, images.MANIFEST_NAME)
+
+def referenced_images():
+    """Local image paths used by products and blog posts."""
+    conn = database.get_db_connection()
+    if not conn:
+        print("❌ DB Connection failed")
+        return []
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT image FROM products WHERE image LIKE '/images/%%'
+        UNION
+        SELECT image FROM blog_posts WHERE image LIKE '/images/%%'
+    """)
+    paths = sorted(row[0] for row in cur.fetchall())
+    cur.close()
+    conn.close()
+    return paths
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    tmp = MANIFEST_PATH + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+
+def is_current(entry, st, formats):
+    """Unchanged source (size + mtime) and every derivative still on disk."""
+    if not entry or entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns:
+        return False
+    if set(entry.get('formats', [])) != set(formats):
+        return False
+    return all(
+        os.path.exists(os.path.join(OUT_DIR, name))
+        for sizes in entry['variants'].values() for name in sizes.values()
+    )
+
+def build_images(force=False):
+    print("🖼️ Building responsive image derivatives...")
+    try:
+        formats = images.available_formats()
+    except ImportError:
+        print("❌ Pillow is not installed (pip install Pillow)")
+        return
+    print(f"Formats: {', '.join(formats)} | Widths: {', '.join(map(str, images.IMAGE_WIDTHS))}")
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    static = StaticFiles(PUBLIC_DIR)
+    manifest = load_manifest()
+    sources = referenced_images()
+
+    jobs = {}
+    for url_path in sources:
+        source = static.resolve(url_path)
+        if not source or not os.path.isfile(source):
+            print(f"⚠️ Missing source: {url_path}")
+            continue
+        st = os.stat(source)
+        if not force and is_current(manifest.get(url_path), st, formats):
+            continue
+        digest = images.file_digest(source)
+        jobs[url_path] = (source, digest, st)
+
+    print(f"{len(sources)} referenced, {len(jobs)} new or changed")
+    if jobs:
+        with ProcessPoolExecutor() as pool:
+            futures = {
+                pool.submit(images.generate_variants, source, digest, OUT_DIR, formats): url_path
+                for url_path, (source, digest, _) in jobs.items()
+            }
+            for future in as_completed(futures):
+                url_path = futures[future]
+                _, digest, st = jobs[url_path]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {url_path}: {e}")
+                    continue
+                manifest[url_path] = {
+                    "sha256": digest,
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "formats": formats,
+                    **result
+                }
+                count = sum(len(sizes) for sizes in result['variants'].values())
+                print(f"✅ {url_path}: {count} variants")
+
+    # Drop entries for images no longer referenced, then files no entry points to
+    manifest = {path: entry for path, entry in manifest.items() if path in sources}
+    save_manifest(manifest)
+    live = {name for entry in manifest.values() for sizes in entry['variants'].values() for name in sizes.values()}
+    removed = 0
+    for name in os.listdir(OUT_DIR):
+        if name != images.MANIFEST_NAME and name not in live:
+            os.remove(os.path.join(OUT_DIR, name))
+            removed += 1
+    print(f"Done. Manifest has {len(manifest)} images, removed {removed} orphaned files.")
+
+if __name__ == "__main__":
+    build_images(force='--force' in sys.argv)
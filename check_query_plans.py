@@ -0,0 +1,205 @@
+import sys
+import os
+import time
+from datetime import date, timedelta
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import psycopg2
+import psycopg2.extensions
+import database
+import migrate
+import session_sweeper
+from db_pool import ConnectionPool
+
+# Everything happens in a scratch schema of the configured database, dropped afterwards
+SCHEMA = "plancheck"
+
+# Synthetic data sizes: large enough that a sequential scan is never the cheapest plan by accident
+USERS = 50000
+PRODUCTS = 50000
+ORDERS = 200000
+ITEMS_PER_ORDER = 3
+SESSIONS = 100000
+POSTS = 20000
+
+PLANS = []
+RECORDING = [False]
+
+class ExplainMixin:
+    """Runs EXPLAIN on every statement before executing it, while recording."""
+    def execute(self, query, vars=None):
+        if RECORDING[0] and query.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH", "UPDATE", "DELETE"):
+            cur = self.connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, vars)
+            PLANS.append((" ".join(query.split()), cur.fetchone()[0][0]["Plan"]))
+            cur.close()
+        return super().execute(query, vars)
+
+class ExplainCursor(ExplainMixin, psycopg2.extensions.cursor):
+    pass
+
+class ExplainDictCursor(ExplainMixin, database.RealDictCursor):
+    pass
+
+# database.py looks RealDictCursor up at call time; plain cursors come from the pool's cursor_factory
+database.RealDictCursor = ExplainDictCursor
+
+def seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+def use_scratch_schema():
+    database.close_pool()
+    database._pool = ConnectionPool(
+        minconn=1, maxconn=2,
+        host=database.DB_HOST, database=database.DB_NAME, user=database.DB_USER,
+        password=database.DB_PASS, port=database.DB_PORT,
+        options=f"-c search_path={SCHEMA}",
+        cursor_factory=ExplainCursor
+    )
+
+def drop_schema():
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        cur.close()
+
+def build_dataset():
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        conn.commit()
+        cur.close()
+        migrate.migrate(conn)
+
+        cur = conn.cursor()
+        print("Filling synthetic data...")
+        cur.execute("""
+            INSERT INTO users (email, password_hash)
+            SELECT 'user' || n || '@plancheck.local', 'x' FROM generate_series(1, %s) n
+        """, (USERS,))
+        cur.execute("""
+            INSERT INTO products (name, price, category, description, stock, is_active)
+            SELECT 'Product ' || n || ' ' || (ARRAY['Mama','Şampuan','Vitamin','Tasma','Oyuncak',
+                                                     'Kedi Kumu','Tarak','Yatak','Kulak Damlası','Ödül Maması'])[1 + n %% 10],
+                   10 + n %% 500, 'cat' || n %% 20, 'Açıklama ' || n, 1000000, n %% 10 <> 0
+            FROM generate_series(1, %s) n
+        """, (PRODUCTS,))
+        cur.execute("""
+            INSERT INTO orders (user_id, total_amount, status, created_at, stock_reserved)
+            SELECT 1 + (random() * (%s - 1))::int, 100,
+                   (ARRAY['Teslim Edildi','Teslim Edildi','Teslim Edildi','Teslim Edildi','Teslim Edildi',
+                          'Teslim Edildi','Kargoda','Hazırlanıyor','İptal'])[1 + n %% 9],
+                   now() - random() * interval '730 days', TRUE
+            FROM generate_series(1, %s) n
+        """, (USERS, ORDERS))
+        cur.execute("""
+            INSERT INTO order_items (order_id, product_id, product_name, quantity, price_at_purchase)
+            SELECT o.id, 1 + (o.id * k) %% %s, 'Product', 1, 10
+            FROM orders o CROSS JOIN generate_series(1, %s) k
+        """, (PRODUCTS, ITEMS_PER_ORDER))
+        cur.execute("""
+            INSERT INTO sessions (session_id, user_id, expires_at)
+            SELECT 'sess-' || n, 1 + n %% %s, now() + (n %% 60 - 30) * interval '1 day'
+            FROM generate_series(1, %s) n
+        """, (USERS, SESSIONS))
+        cur.execute("""
+            INSERT INTO blog_posts (title, slug, content, summary, is_published, created_at)
+            SELECT 'Post ' || n, 'post-' || n,
+                   repeat('lorem ipsum ', 50) || CASE WHEN n %% 50 = 0 THEN 'kedi bakımı' ELSE '' END,
+                   'summary', n %% 5 <> 0,
+                   now() - n * interval '1 hour'
+            FROM generate_series(1, %s) n
+        """, (POSTS,))
+        conn.commit()
+        for table in ("users", "products", "orders", "order_items", "sessions", "blog_posts"):
+            cur.execute(f"ANALYZE {table}")
+        conn.commit()
+        cur.close()
+
+def hot_queries():
+    """(label, call, tables where a seq scan is expected and why)."""
+    today = date.today()
+    first_page = lambda: database.get_orders_page(limit=50, with_total=False)
+    return [
+        ("get_user_orders", lambda: database.get_user_orders(1234), {}),
+        ("get_user_by_email", lambda: database.get_user_by_email("user4321@plancheck.local"), {}),
+        ("get_session", lambda: (database.session_cache.clear(), database.get_session("sess-777")), {}),
+        ("delete_session", lambda: database.delete_session("sess-778"), {}),
+        ("session_sweeper.sweep_batch", lambda: session_sweeper.sweep_batch(1000), {}),
+        ("get_product", lambda: database.get_product(42), {}),
+        ("create_order", lambda: database.create_order(1234, [{"product_id": 7, "quantity": 1},
+                                                              {"product_id": 13, "quantity": 2}]), {}),
+        ("update_order_status", lambda: database.update_order_status(4321, "İptal"), {}),
+        ("get_orders_page (first page)", first_page, {}),
+        ("get_orders_page (next page)", lambda: database.get_orders_page(
+            limit=50, cursor=first_page()["next_cursor"], with_total=False), {}),
+        ("get_orders_page (status + total)", lambda: database.get_orders_page(
+            limit=50, status="Hazırlanıyor"), {}),
+        ("get_orders_page (date range)", lambda: database.get_orders_page(
+            limit=50, date_from=today - timedelta(days=7), date_to=today, with_total=False), {}),
+        ("get_orders_page (email)", lambda: database.get_orders_page(limit=50, email="user42@", with_total=False),
+            {"users": "substring match on email cannot use a b-tree index"}),
+        ("get_post (slug)", lambda: database.get_post("post-500"), {}),
+        ("get_post (id)", lambda: database.get_post("500"), {}),
+        ("get_posts_page (published)", lambda: database.get_posts_page(public_only=True), {}),
+        ("get_posts_page (admin, next page)", lambda: database.get_posts_page(
+            cursor=database.get_posts_page(limit=50)["next_cursor"], limit=50), {}),
+        ("search (words)", lambda: database.search("şampuan 1234"), {}),
+        ("search (common word, full ranking)", lambda: database.search("kedi"), {}),
+        ("search (folded type-ahead prefix)", lambda: database.search("kulak dam", prefix=True), {}),
+        ("search (one prefix)", lambda: database.search("sampu", prefix=True), {}),
+        ("get_all_products (active)", lambda: database.get_all_products(),
+            {"products": "returns every active product"}),
+    ]
+
+def run_check(keep=False):
+    print("--- Query plan check ---")
+    use_scratch_schema()
+    started = time.perf_counter()
+    failures = 0
+    try:
+        build_dataset()
+        print(f"Dataset ready in {time.perf_counter() - started:.1f}s "
+              f"({ORDERS} orders, {ORDERS * ITEMS_PER_ORDER} items, {USERS} users, {SESSIONS} sessions)")
+        for label, call, allowed in hot_queries():
+            del PLANS[:]
+            RECORDING[0] = True
+            try:
+                call()
+            finally:
+                RECORDING[0] = False
+            bad = []
+            for sql, plan in PLANS:
+                for table in seq_scans(plan):
+                    if table not in allowed:
+                        bad.append((table, sql))
+            if not PLANS:
+                failures += 1
+                print(f"❌ {label}: no statements recorded (did the call fail?)")
+            elif bad:
+                failures += 1
+                print(f"❌ {label}")
+                for table, sql in bad:
+                    print(f"     Seq Scan on {table}: {sql[:160]}")
+            else:
+                notes = "; ".join(f"{t}: {why}" for t, why in allowed.items())
+                print(f"✅ {label} ({len(PLANS)} statements){' - allowed: ' + notes if notes else ''}")
+    finally:
+        if not keep:
+            drop_schema()
+        database.close_pool()
+
+    print(f"\n{'❌ ' + str(failures) + ' queries fell back to a sequential scan' if failures else '✅ All hot queries use indexes'}")
+    return failures == 0
+
+if __name__ == "__main__":
+    sys.exit(0 if run_check(keep='--keep' in sys.argv) else 1)
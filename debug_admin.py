@@ -1,5 +1,10 @@
-import psycopg2
-from src.database import get_db_connection
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from database import get_db_connection
 
 def debug_admin():
     email = "admin@vetaris.com"
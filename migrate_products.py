@@ -1,7 +1,11 @@
 import json
+import sys
 import os
-import psycopg2
-from src.database import get_db_connection
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from database import get_db_connection
 
 PRODUCTS_FILE = 'data/products.json'
 
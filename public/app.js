@@ -31,6 +31,14 @@ document.addEventListener('DOMContentLoaded', () => {
 // Global variable for products
 let allProducts = [];
 
+// Responsive images: the server answers /images/x.png?w=640 with the closest resized WebP/AVIF/JPEG
+const IMAGE_WIDTHS = [320, 640, 960];
+
+function imageSrcset(src) {
+    if (!src || !src.startsWith('/images/')) return '';
+    return IMAGE_WIDTHS.map(w => `${src}?w=${w} ${w}w`).join(', ');
+}
+
 async function fetchProducts() {
     const productsGrid = document.getElementById('products-grid');
 
@@ -71,7 +79,7 @@ function createProductCard(product) {
     };
 
     card.innerHTML = `
-        <img src="${product.image}" alt="${product.name}" class="product-image" loading="lazy">
+        <img src="${product.image}" srcset="${imageSrcset(product.image)}" sizes="(max-width: 600px) 100vw, 320px" alt="${product.name}" class="product-image" loading="lazy">
         <div class="product-info">
             <span class="product-category">${product.category}</span>
             <h3 class="product-title">${product.name}</h3>
@@ -230,9 +238,7 @@ function openModal(product) {
     document.getElementById('modal-price').innerText = product.price.toFixed(2) + ' ₺';
 
     const descEl = document.getElementById('modal-desc');
-    descEl.innerHTML = (typeof marked !== 'undefined' && product.description)
-        ? marked.parse(product.description)
-        : (product.description || '');
+    descEl.innerHTML = product.description_html || '';  // rendered and sanitized on the server
 
     const modalBtn = document.getElementById('modal-add-btn');
     modalBtn.onclick = () => addToCart(product.id);
@@ -475,7 +481,7 @@ function initHeroCarousel(products) {
         if (index === 0) slide.classList.add('active');
 
         slide.innerHTML = `
-            <img src="${p.image}" alt="${p.name}">
+            <img src="${p.image}" srcset="${imageSrcset(p.image)}" sizes="(max-width: 600px) 100vw, 480px" alt="${p.name}">
             <h3>${p.name}</h3>
             <div class="price">${p.price} ₺</div>
         `;
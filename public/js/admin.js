@@ -5,6 +5,7 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 let PRODUCTS = [];
+let productStockSeen = null; // Stock shown when the edit form opened (sent as expected_stock)
 let ORDERS = [];
 let POSTS = [];
 
@@ -62,13 +63,16 @@ function setupNavigation() {
 
 // --- Dashboard ---
 async function loadDashboard() {
-    await Promise.all([fetchProducts(), fetchOrders()]);
-
-    document.getElementById('total-orders-count').innerText = ORDERS.length;
+    // Only the counts are needed here, so ask for single-row pages with totals
+    const [, allOrders, pendingOrders] = await Promise.all([
+        fetchProducts(),
+        fetchOrdersPage({ limit: 1 }),
+        fetchOrdersPage({ limit: 1, status: 'Hazırlanıyor' })
+    ]);
+
+    document.getElementById('total-orders-count').innerText = allOrders ? allOrders.total : 0;
     document.getElementById('total-products-count').innerText = PRODUCTS.length;
-
-    const pending = ORDERS.filter(o => o.status === 'Hazırlanıyor').length;
-    document.getElementById('pending-orders-count').innerText = pending;
+    document.getElementById('pending-orders-count').innerText = pendingOrders ? pendingOrders.total : 0;
 }
 
 // --- Products Logic ---
@@ -110,6 +114,7 @@ window.openEditProduct = (id) => {
     document.getElementById('pName').value = p.name;
     document.getElementById('pPrice').value = p.price;
     document.getElementById('pStock').value = p.stock || 0;
+    productStockSeen = p.stock || 0;
     document.getElementById('pCategory').value = p.category;
     document.getElementById('pImage').value = p.image;
     document.getElementById('pDesc').value = p.description;
@@ -140,15 +145,22 @@ document.getElementById('productForm').addEventListener('submit', async (e) => {
     e.preventDefault();
 
     const id = document.getElementById('productId').value;
+    const stock = parseInt(document.getElementById('pStock').value) || 0;
     const data = {
         name: document.getElementById('pName').value,
         price: parseFloat(document.getElementById('pPrice').value),
-        stock: parseInt(document.getElementById('pStock').value) || 0,
         category: document.getElementById('pCategory').value,
         image: document.getElementById('pImage').value,
         description: document.getElementById('pDesc').value,
         is_active: document.getElementById('pActive').checked
     };
+    if (!id) {
+        data.stock = stock;
+    } else if (stock !== productStockSeen) {
+        // Orders keep reserving stock: the server only applies this if stock is still what we saw
+        data.stock = stock;
+        data.expected_stock = productStockSeen;
+    }
 
     let res;
     if (id) {
@@ -170,19 +182,58 @@ document.getElementById('productForm').addEventListener('submit', async (e) => {
     if (res.ok) {
         document.getElementById('productModal').style.display = 'none';
         loadProducts();
+    } else if (res.status === 409) {
+        const body = await res.json();
+        productStockSeen = body.stock;
+        alert(`Stok bu arada değişti (şu an ${body.stock}). Yeni değeri kontrol edip tekrar kaydedin.`);
     } else {
         alert('İşlem başarısız');
     }
 });
 
 // --- Orders Logic ---
-async function fetchOrders() {
-    const res = await fetch('/api/admin/orders');
-    if (res.ok) ORDERS = await res.json();
+const ORDER_PAGE_SIZE = 25;
+let orderCursors = [null]; // Cursor used to load each visited page
+let orderPage = 0;
+let orderNextCursor = null;
+let orderTotal = null;
+
+async function fetchOrdersPage(params) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined && value !== '') query.set(key, value);
+    });
+    const res = await fetch(`/api/admin/orders?${query}`);
+    if (!res.ok) return null;
+    return res.json();
 }
 
-async function loadOrders() {
-    await fetchOrders();
+function getOrderFilters() {
+    return {
+        status: document.getElementById('filterStatus').value,
+        from: document.getElementById('filterFrom').value,
+        to: document.getElementById('filterTo').value,
+        email: document.getElementById('filterEmail').value.trim()
+    };
+}
+
+async function loadOrders(page = 0) {
+    if (page === 0) orderCursors = [null];
+
+    // Total is only counted for the first page; later pages stay a single indexed range scan
+    const data = await fetchOrdersPage({
+        ...getOrderFilters(),
+        limit: ORDER_PAGE_SIZE,
+        cursor: orderCursors[page],
+        total: page === 0 ? 1 : 0
+    });
+    if (!data) return;
+
+    orderPage = page;
+    orderNextCursor = data.next_cursor;
+    if (page === 0) orderTotal = data.total;
+    ORDERS = data.orders;
+
     const tbody = document.getElementById('orders-table-body');
     tbody.innerHTML = '';
 
@@ -199,8 +250,31 @@ async function loadOrders() {
         `;
         tbody.appendChild(tr);
     });
+
+    const first = orderPage * ORDER_PAGE_SIZE + 1;
+    const last = orderPage * ORDER_PAGE_SIZE + ORDERS.length;
+    document.getElementById('ordersPageInfo').innerText = ORDERS.length
+        ? `${first}-${last} / ${orderTotal ?? '?'}`
+        : 'Sipariş bulunamadı';
+    document.getElementById('ordersPrevBtn').disabled = orderPage === 0;
+    document.getElementById('ordersNextBtn').disabled = !orderNextCursor;
 }
 
+document.getElementById('orderFilters').addEventListener('submit', (e) => {
+    e.preventDefault();
+    loadOrders(0);
+});
+
+document.getElementById('ordersPrevBtn').addEventListener('click', () => {
+    if (orderPage > 0) loadOrders(orderPage - 1);
+});
+
+document.getElementById('ordersNextBtn').addEventListener('click', () => {
+    if (!orderNextCursor) return;
+    orderCursors[orderPage + 1] = orderNextCursor;
+    loadOrders(orderPage + 1);
+});
+
 window.viewOrder = (id) => {
     const order = ORDERS.find(x => x.id === id);
     if (!order) return;
@@ -228,7 +302,9 @@ window.viewOrder = (id) => {
 
         if (res.ok) {
             document.getElementById('orderModal').style.display = 'none';
-            loadOrders();
+            loadOrders(orderPage);
+        } else if (res.status === 409) {
+            alert('Sipariş yeniden açılamadı: yeterli stok yok');
         } else {
             alert('Güncelleme başarısız');
         }
@@ -238,13 +314,25 @@ window.viewOrder = (id) => {
 };
 
 // --- Blog Logic ---
-async function fetchPosts() {
-    const res = await fetch('/api/admin/posts');
-    if (res.ok) POSTS = await res.json();
-}
+const POST_PAGE_SIZE = 25;
+let postCursors = [null]; // Cursor used to load each visited page
+let postPage = 0;
+let postNextCursor = null;
+
+async function loadBlog(page = 0) {
+    if (page === 0) postCursors = [null];
+
+    // The list carries no post bodies; openEditPost fetches the full post
+    const query = new URLSearchParams({ limit: POST_PAGE_SIZE, fields: 'id,title,created_at,is_published' });
+    if (postCursors[page]) query.set('cursor', postCursors[page]);
+    const res = await fetch(`/api/admin/posts?${query}`);
+    if (!res.ok) return;
+    const data = await res.json();
+
+    postPage = page;
+    postNextCursor = data.next_cursor;
+    POSTS = data.posts;
 
-async function loadBlog() {
-    await fetchPosts();
     const tbody = document.getElementById('blog-table-body');
     tbody.innerHTML = '';
 
@@ -263,8 +351,21 @@ async function loadBlog() {
         `;
         tbody.appendChild(tr);
     });
+
+    document.getElementById('postsPrevBtn').disabled = postPage === 0;
+    document.getElementById('postsNextBtn').disabled = !postNextCursor;
 }
 
+document.getElementById('postsPrevBtn').addEventListener('click', () => {
+    if (postPage > 0) loadBlog(postPage - 1);
+});
+
+document.getElementById('postsNextBtn').addEventListener('click', () => {
+    if (!postNextCursor) return;
+    postCursors[postPage + 1] = postNextCursor;
+    loadBlog(postPage + 1);
+});
+
 document.getElementById('addPostBtn').addEventListener('click', () => {
     document.getElementById('blogModalTitle').innerText = 'Yeni Yazı Ekle';
     document.getElementById('blogForm').reset();
@@ -272,9 +373,10 @@ document.getElementById('addPostBtn').addEventListener('click', () => {
     document.getElementById('blogModal').style.display = 'block';
 });
 
-window.openEditPost = (id) => {
-    const p = POSTS.find(x => x.id === id);
-    if (!p) return;
+window.openEditPost = async (id) => {
+    const res = await fetch(`/api/posts/${id}`);
+    if (!res.ok) return;
+    const p = await res.json();
 
     document.getElementById('blogModalTitle').innerText = 'Yazıyı Düzenle';
     document.getElementById('postId').value = p.id;
@@ -292,7 +394,7 @@ window.deletePost = async (id) => {
 
     const res = await fetch(`/api/posts/${id}`, { method: 'DELETE' });
     if (res.ok) {
-        loadBlog();
+        loadBlog(postPage);
     } else {
         alert('Silme başarısız');
     }
@@ -329,7 +431,7 @@ document.getElementById('blogForm').addEventListener('submit', async (e) => {
 
     if (res.ok) {
         document.getElementById('blogModal').style.display = 'none';
-        loadBlog();
+        loadBlog(id ? postPage : 0);
     } else {
         alert('İşlem başarısız');
     }
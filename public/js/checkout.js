@@ -120,6 +120,8 @@ document.getElementById('paymentForm').addEventListener('submit', async (e) => {
             setTimeout(() => {
                 window.location.href = '/account.html';
             }, 2000);
+        } else if (res.status === 409) {
+            throw new Error('Sepetinizdeki bazı ürünler için yeterli stok kalmadı. Lütfen sepetinizi güncelleyin.');
         } else {
             const err = await res.json();
             throw new Error(err.error || 'Sipariş oluşturulamadı');
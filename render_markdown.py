@@ -0,0 +1,33 @@
+import sys
+import os
+import time
+import argparse
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import logs
+import database
+
+logs.setup(fmt="text")
+
+def main():
+    parser = argparse.ArgumentParser(description="Render stored Markdown (blog posts, product descriptions) to HTML")
+    parser.add_argument('--force', action='store_true',
+                        help="render every row again, not only new or changed ones")
+    parser.add_argument('--batch-size', type=int, default=200, help="rows per transaction")
+    args = parser.parse_args()
+
+    print("--- Markdown render ---")
+    started = time.monotonic()
+    try:
+        results = database.render_stored_markdown(force=args.force, batch_size=args.batch_size)
+    except Exception as e:
+        print(f"❌ Render failed: {e}")
+        sys.exit(1)
+    for table, (checked, rendered) in results.items():
+        print(f"📝 {table}: {rendered} of {checked} rows rendered")
+    print(f"✅ Done ({time.monotonic() - started:.2f}s)")
+
+if __name__ == "__main__":
+    main()
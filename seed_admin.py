@@ -1,5 +1,10 @@
-from src.database import create_user, get_db_connection, init_db
-import psycopg2
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from database import create_user, get_db_connection, init_db, set_user_admin
 
 def seed_admin():
     # Ensure DB is up to date (creates tables/columns if missing)
@@ -37,12 +42,7 @@ def seed_admin():
             try:
                 user = create_user(email, password)
                 if user:
-                    conn = get_db_connection()
-                    cur = conn.cursor()
-                    cur.execute("UPDATE users SET is_admin = TRUE WHERE id = %s", (user[0],))
-                    conn.commit()
-                    cur.close()
-                    conn.close()
+                    set_user_admin(user[0], True)
                     print(f"✅ Created Admin User: {email}")
             except ValueError:
                 print("User already exists (caught in creation)")
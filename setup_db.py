@@ -1,8 +1,30 @@
-from src import database
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import logs
+import database
+import migrate
+
+# Show migration progress as plain text
+logs.setup(fmt="text")
+
+def show_status():
+    with database.db_connection() as conn:
+        rows = migrate.status(conn)
+    icons = {"applied": "✅", "pending": "⏳", "changed": "⚠️"}
+    for migration, state in rows:
+        print(f"{icons[state]} {migration.version:04d}_{migration.name}: {state}")
+
+if '--status' in sys.argv:
+    show_status()
+    sys.exit(0)
 
 print("--- Initializing Database Tables ---")
-try:
-    database.init_db()
+if database.init_db():
     print("✅ Tables initialized successfully (or already existed).")
-except Exception as e:
-    print(f"❌ Failed to initialize tables: {e}")
+else:
+    print("❌ Failed to initialize tables")
+    sys.exit(1)
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache whose entries expire after a TTL.
+
+    `negative_ttl` is used for entries stored with a value of None, so that
+    lookups for keys that do not exist can be cached for a shorter time.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60.0, negative_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=MISSING):
+        """Return the cached value, or `default` (a sentinel by default) on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+        return default
+
+    def set(self, key, value):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        """Drop every entry whose value matches `predicate`. O(n), meant for rare writes."""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(v)]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class VersionedSnapshot:
+    """A value derived from a versioned source, rebuilt at most once per version.
+
+    `version_fn()` must be cheap (it is called on every read). `builder()` is
+    only invoked when the version changed or the snapshot is older than
+    `max_age`; concurrent readers that miss at the same time wait for a single
+    rebuild instead of each running their own.
+    """
+
+    def __init__(self, version_fn, builder, max_age=None):
+        self._version_fn = version_fn
+        self._builder = builder
+        self.max_age = max_age
+        self._snapshot = None  # (version, built_at, value)
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    def _current(self, version, now):
+        snap = self._snapshot
+        if snap is None or snap[0] != version:
+            return None
+        if self.max_age is not None and now - snap[1] > self.max_age:
+            return None
+        return snap
+
+    def get(self):
+        snap = self._current(self._version_fn(), time.monotonic())
+        if snap is not None:
+            self.hits += 1
+            return snap[2]
+
+        with self._build_lock:
+            # Another thread may have rebuilt it while we waited for the lock
+            version = self._version_fn()
+            snap = self._current(version, time.monotonic())
+            if snap is not None:
+                self.hits += 1
+                return snap[2]
+            value = self._builder()
+            self._snapshot = (version, time.monotonic(), value)
+            self.rebuilds += 1
+            return value
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def stats(self):
+        snap = self._snapshot
+        return {
+            "version": snap[0] if snap else None,
+            "age": round(time.monotonic() - snap[1], 3) if snap else None,
+            "max_age": self.max_age,
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+        }
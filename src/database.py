@@ -1,570 +1,1055 @@
 import os
+import logging
+import threading
+import functools
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
-import bcrypt
 import uuid
 import time
+import base64
+from decimal import Decimal
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from db_pool import ConnectionPool, PoolReaper
+from cache import TTLCache, MISSING
+import metrics
+import query_trace
+import invalidation
+import markup
+import textfold
+import inventory
+import migrate
+from inventory import InsufficientStock, StockChanged, CANCELLED_STATUS
+
 load_dotenv()
 
+import passwords  # reads BCRYPT_* settings, so after load_dotenv()
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME", "vetaris")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASS = os.getenv("DB_PASS", "password")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# Connection pool sizing (shared by all server threads)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))          # seconds to wait for a free connection
+DB_POOL_MAX_AGE = float(os.getenv("DB_POOL_MAX_AGE", "1800"))       # recycle connections older than this
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))      # close extra idle connections after this
+DB_POOL_HEALTH_CHECK = float(os.getenv("DB_POOL_HEALTH_CHECK", "30"))  # ping connections idle longer than this
+
+# Session lookup cache (in front of get_session)
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "60"))
+SESSION_CACHE_NEGATIVE_TTL = float(os.getenv("SESSION_CACHE_NEGATIVE_TTL", "5"))  # unknown/expired session ids
+
+# Full-text search (/api/search)
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))  # type-ahead: matches ranked per table
+SEARCH_MIN_PREFIX = int(os.getenv("SEARCH_MIN_PREFIX", "3"))              # type-ahead: shorter last words match whole
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Bumped on every product write; readers compare it to decide whether cached catalog data is stale
+_catalog_version = 0
+_catalog_version_lock = threading.Lock()
+
+session_cache = TTLCache(
+    maxsize=SESSION_CACHE_SIZE,
+    ttl=SESSION_CACHE_TTL,
+    negative_ttl=SESSION_CACHE_NEGATIVE_TTL
+)
+
+# Logouts and admin flag changes are announced here, so every process (prefork
+# workers, CLI tools) can drop its cached copies; see start_session_listener()
+SESSION_CHANNEL = "vetaris_sessions"
+session_listener = None
+
+log = logging.getLogger("vetaris.db")
+
+def timed(func):
+    """Count calls to `func` and their duration in vetaris_db_query_duration_seconds."""
+    histogram = metrics.DB_QUERY_SECONDS.labels(func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return wrapper
+
+# NUMERIC columns as float, for rows that are only serialized to JSON:
+# Decimal would need a Python default() call per value in the encoder
+NUMERIC_AS_FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, "NUMERIC_AS_FLOAT",
+    lambda value, cur: float(value) if value is not None else None
+)
+
+def json_cursor(conn):
+    """RealDictCursor returning NUMERIC as float; use only where no arithmetic follows."""
+    cur = conn.cursor(cursor_factory=RealDictCursor)
+    psycopg2.extensions.register_type(NUMERIC_AS_FLOAT, cur)
+    return cur
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    minconn=DB_POOL_MIN,
+                    maxconn=DB_POOL_MAX,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_age=DB_POOL_MAX_AGE,
+                    max_idle=DB_POOL_MAX_IDLE,
+                    health_check_after=DB_POOL_HEALTH_CHECK,
+                    connection_factory=query_trace.TracedConnection,
+                    host=DB_HOST,
+                    database=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASS,
+                    port=DB_PORT
+                )
+                PoolReaper(_pool, interval=max(DB_POOL_MAX_IDLE / 2, 10)).start()
+    return _pool
+
+def pool_stats():
+    if _pool is None:
+        return None
+    return _pool.stats()
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+@contextmanager
+def db_connection():
+    """Borrow a pooled connection; it is always returned, even on errors."""
+    with get_pool().connection() as conn:
+        yield conn
+
 def get_db_connection():
+    """Check out a pooled connection. Calling conn.close() returns it to the pool."""
     try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-            port=DB_PORT
-        )
-        return conn
+        return get_pool().getconn()
     except Exception as e:
-        print(f"Error connecting to database: {e}")
+        log.error("Error connecting to database: %s", e)
         return None
 
 def init_db():
-    conn = get_db_connection()
-    if not conn:
-        print("Could not connect to database for initialization.")
-        return
-
+    """Bring the schema up to date (src/migrations). Cheap when nothing is pending."""
     try:
-        cur = conn.cursor()
-        
-        # Create Users Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                is_admin BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Create Sessions Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id VARCHAR(255) PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP
-            );
-        """)
-
-        # Create Products Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) NOT NULL,
-                price DECIMAL(10, 2) NOT NULL,
-                image VARCHAR(255),
-                description TEXT,
-                category VARCHAR(100),
-                stock INTEGER DEFAULT 0,
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-
-        # Create Orders Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS orders (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id),
-                total_amount DECIMAL(10, 2) NOT NULL,
-                status VARCHAR(50) DEFAULT 'Hazırlanıyor',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-
-        # Create Order Items Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS order_items (
-                id SERIAL PRIMARY KEY,
-                order_id INTEGER REFERENCES orders(id),
-                product_id INTEGER NOT NULL,
-                product_name VARCHAR(255) NOT NULL,
-                quantity INTEGER NOT NULL,
-                price_at_purchase DECIMAL(10, 2) NOT NULL
-            );
-        """)
-
-        # Create Blog Posts Table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS blog_posts (
-                id SERIAL PRIMARY KEY,
-                title VARCHAR(255) NOT NULL,
-                slug VARCHAR(255) UNIQUE NOT NULL,
-                content TEXT,
-                image VARCHAR(255),
-                summary TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_published BOOLEAN DEFAULT TRUE
-            );
-        """)
-        
-        # Check/Add is_admin column if it doesn't exist (for migration)
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS is_admin BOOLEAN DEFAULT FALSE;")
-        except Exception as e:
-            print(f"Notice: Could not alter table (might already exist or other issue): {e}")
-
-        conn.commit()
-        cur.close()
-        conn.close()
-        print("Database initialized successfully.")
+        with db_connection() as conn:
+            applied = migrate.migrate(conn)
+        if applied:
+            log.info("Database initialized successfully (%d migrations applied).", len(applied))
+        else:
+            log.info("Database schema is up to date.")
+        return True
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        log.error("Error initializing database: %s", e)
+        return False
 
 def create_user(email, password):
-    # ... (existing code unchanged) ...
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("Database connection failed")
+    # Hashed before taking a DB connection; HashingBusy propagates to the caller
+    password_hash = passwords.hash_password(password)
+    return insert_user(email, password_hash)
 
+@timed
+def insert_user(email, password_hash):
     try:
-        cur = conn.cursor()
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        
-        cur.execute(
-            "INSERT INTO users (email, password_hash) VALUES (%s, %s) RETURNING id, email",
-            (email, password_hash)
-        )
-        user = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
-        print(f"✅ DB: New user created - Email: {email}, ID: {user[0]}")
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT INTO users (email, password_hash) VALUES (%s, %s) RETURNING id, email",
+                (email, password_hash)
+            )
+            user = cur.fetchone()
+            conn.commit()
+            cur.close()
+        log.info("New user created", extra={"user_id": user[0]})
         return user
     except psycopg2.IntegrityError:
-        conn.rollback()
-        conn.close()
-        print(f"⚠️ DB: Duplicate registration attempt for {email}")
+        log.warning("Duplicate registration attempt for %s", email)
         raise ValueError("User already exists") 
     except Exception as e:
-        conn.close()
-        print(f"❌ DB: Error creating user {email}: {e}")
+        log.error("Error creating user %s: %s", email, e)
         raise Exception(f"Database error: {str(e)}")
 
-# ... (keep existing get_user_by_email, verify_password, create_session, get_session, delete_session) ...
+ORDER_MAX_QUANTITY = 999  # per line
+
+# Columns orders are returned with (get_orders_page lists them with its join);
+# stock_reserved only steers update_order_status
+ORDER_COLUMNS = "id, user_id, total_amount, status, created_at"
+
+class InvalidOrder(ValueError):
+    """One or more cart lines were rejected; `problems` says which and why."""
+    def __init__(self, problems):
+        super().__init__("Invalid order items")
+        self.problems = problems
 
-def create_order(user_id, items, total_amount):
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("Database connection failed")
+def _order_lines(items):
+    """Merge cart items into {product_id: quantity}, keeping cart order.
 
+    Accepts {"product_id"} (checkout.js) or {"id"} per item. Any client-side
+    price or name is ignored.
+    """
+    if not isinstance(items, list) or not items:
+        raise InvalidOrder([{"reason": "empty_cart"}])
+    lines, problems = {}, []
+    for item in items:
+        raw_id = item.get('product_id', item.get('id')) if isinstance(item, dict) else None
+        try:
+            product_id = int(raw_id)
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            problems.append({"product_id": raw_id, "reason": "invalid_item"})
+            continue
+        lines[product_id] = lines.get(product_id, 0) + quantity
+    for product_id, quantity in lines.items():
+        if not 1 <= quantity <= ORDER_MAX_QUANTITY:
+            problems.append({"product_id": product_id, "reason": "invalid_quantity"})
+    if problems:
+        raise InvalidOrder(problems)
+    return lines
+
+@timed
+def create_order(user_id, items):
+    """Create an order priced from the products table and reserve its stock.
+
+    Three round trips whatever the cart size: one query validates every line,
+    one statement inserts the order row and all of its items, one reserves
+    stock for all lines (raising InsufficientStock, which rolls everything back).
+    """
+    lines = _order_lines(items)
     try:
-        cur = conn.cursor()
-        
-        # 1. Create Order
-        cur.execute(
-            "INSERT INTO orders (user_id, total_amount) VALUES (%s, %s) RETURNING id",
-            (user_id, total_amount)
-        )
-        order_id = cur.fetchone()[0]
-        
-        # 2. Insert Items
-        for item in items:
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+
+            # 1. Current name, price and availability of every product in the cart
+            cur.execute(
+                "SELECT id, name, price, is_active FROM products WHERE id = ANY(%s)",
+                (list(lines),)
+            )
+            products = {row['id']: row for row in cur.fetchall()}
+
+            problems = []
+            total = Decimal('0')
+            for product_id, quantity in lines.items():
+                product = products.get(product_id)
+                if product is None:
+                    problems.append({"product_id": product_id, "reason": "not_found"})
+                elif not product['is_active']:
+                    problems.append({"product_id": product_id, "reason": "inactive"})
+                else:
+                    total += product['price'] * quantity
+            if problems:
+                raise InvalidOrder(problems)
+
+            # 2. Order and items in one statement
+            ids = list(lines)
             cur.execute("""
-                INSERT INTO order_items (order_id, product_id, product_name, quantity, price_at_purchase)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (order_id, item['id'], item['name'], item['quantity'], item['price']))
-            
-        conn.commit()
-        cur.close()
-        conn.close()
-        print(f"✅ DB: Order created - OrderID: {order_id}, UserID: {user_id}")
+                WITH new_order AS (
+                    INSERT INTO orders (user_id, total_amount, stock_reserved) VALUES (%s, %s, TRUE) RETURNING id
+                ), new_items AS (
+                    INSERT INTO order_items (order_id, product_id, product_name, quantity, price_at_purchase)
+                    SELECT new_order.id, l.product_id, l.product_name, l.quantity, l.price
+                    FROM new_order,
+                         unnest(%s::int[], %s::text[], %s::int[], %s::numeric[])
+                             AS l(product_id, product_name, quantity, price)
+                )
+                SELECT id FROM new_order
+            """, (
+                user_id, total,
+                ids,
+                [products[i]['name'] for i in ids],
+                [lines[i] for i in ids],
+                [products[i]['price'] for i in ids],
+            ))
+            order_id = cur.fetchone()['id']
+
+            # 3. Stock last, so the product row locks are held only until the commit.
+            #    The order row above is marked stock_reserved in this same transaction
+            inventory.reserve(conn, lines)
+
+            conn.commit()
+            cur.close()
+        log.info("Order created", extra={"order_id": order_id, "user_id": user_id, "total": str(total)})
         return order_id
+    except (InvalidOrder, InsufficientStock):
+        raise
     except Exception as e:
-        # conn.rollback() # Context manager or explicit rollback would be better but keeping simple
-        print(f"❌ DB: Error creating order: {e}")
-        if conn: conn.close()
+        # db_connection() rolls back the transaction before releasing the connection
+        log.error("Error creating order: %s", e)
         raise e
 
-def get_user_orders(user_id):
-    conn = get_db_connection()
-    if not conn:
-        return []
+def _attach_order_items(cur, orders):
+    """Fill order['items'] for every order using a single batched query."""
+    by_id = {}
+    for order in orders:
+        order['items'] = []
+        by_id[order['id']] = order
+    if not by_id:
+        return orders
 
+    cur.execute("""
+        SELECT * FROM order_items
+        WHERE order_id = ANY(%s)
+        ORDER BY order_id, id
+    """, (list(by_id),))
+    for item in cur.fetchall():
+        by_id[item['order_id']]['items'].append(item)
+    return orders
+
+@timed
+def get_user_orders(user_id):
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        with db_connection() as conn:
+            cur = json_cursor(conn)
         
-        # Get Orders
-        cur.execute("""
-            SELECT * FROM orders 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC
-        """, (user_id,))
-        orders = cur.fetchall()
+            # Get Orders
+            cur.execute(f"""
+                SELECT {ORDER_COLUMNS} FROM orders
+                WHERE user_id = %s 
+                ORDER BY created_at DESC
+            """, (user_id,))
+            orders = cur.fetchall()
         
-        # For each order, get items (Not super efficient but simple)
-        for order in orders:
-            cur.execute("""
-                SELECT * FROM order_items WHERE order_id = %s
-            """, (order['id'],))
-            order['items'] = cur.fetchall()
+            # Get items for all orders in one query
+            _attach_order_items(cur, orders)
             
-        cur.close()
-        conn.close()
+            cur.close()
         return orders
     except Exception as e:
-        print(f"❌ DB: Error fetching orders: {e}")
-        if conn: conn.close()
+        log.error("Error fetching orders: %s", e)
         return []
 
+@timed
 def get_user_by_email(email):
-    conn = get_db_connection()
-    if not conn:
-        return None
-
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM users WHERE email = %s", (email,))
-        user = cur.fetchone()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+            user = cur.fetchone()
+            cur.close()
         return user
     except Exception as e:
-        print(f"❌ DB: Error getting user {email}: {e}")
-        conn.close()
+        log.error("Error getting user %s: %s", email, e)
         return None
 
 def verify_password(stored_hash, password):
-    result = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
-    return result
+    return passwords.check_password(stored_hash, password)
 
-def create_session(user_id):
-    conn = get_db_connection()
-    if not conn:
-        return None
+@timed
+def update_password_hash(user_id, password_hash):
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE users SET password_hash = %s WHERE id = %s", (password_hash, user_id))
+            conn.commit()
+            cur.close()
+        return True
+    except Exception as e:
+        log.error("Error updating password hash for user %s: %s", user_id, e)
+        return False
 
+@timed
+def create_session(user_id):
     try:
-        cur = conn.cursor()
-        session_id = str(uuid.uuid4())
-        # 30 days expiration
-        expires_at = time.time() + (30 * 24 * 60 * 60) 
+        with db_connection() as conn:
+            cur = conn.cursor()
+            session_id = str(uuid.uuid4())
+            # 30 days expiration
+            expires_at = time.time() + (30 * 24 * 60 * 60) 
         
-        cur.execute(
-            "INSERT INTO sessions (session_id, user_id, expires_at) VALUES (%s, %s, to_timestamp(%s))",
-            (session_id, user_id, expires_at)
-        )
-        conn.commit()
-        cur.close()
-        conn.close()
-        print(f"✅ DB: Session created for UserID: {user_id}")
+            cur.execute(
+                "INSERT INTO sessions (session_id, user_id, expires_at) VALUES (%s, %s, to_timestamp(%s))",
+                (session_id, user_id, expires_at)
+            )
+            conn.commit()
+            cur.close()
+        log.info("Session created", extra={"user_id": user_id})
         return session_id
     except Exception as e:
-        print(f"❌ DB: Error creating session: {e}")
-        conn.close()
+        log.error("Error creating session: %s", e)
         return None
 
+def start_session_listener():
+    """Follow session changes made by other processes (LISTEN on SESSION_CHANNEL)."""
+    global session_listener
+    if session_listener is None:
+        session_listener = invalidation.Listener(
+            SESSION_CHANNEL, _on_session_event, session_cache.clear,
+            host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASS, port=DB_PORT
+        )
+        session_listener.start()
+    return session_listener
+
+def _on_session_event(payload):
+    kind, _, key = payload.partition(":")
+    if kind == "session":
+        session_cache.invalidate(key)
+    elif kind == "user":
+        user_id = int(key)
+        session_cache.invalidate_where(lambda s: s is not None and s['user_id'] == user_id)
+    else:
+        session_cache.clear()
+
 def get_session(session_id):
-    conn = get_db_connection()
-    if not conn:
+    """Return the session (joined with its user) or None.
+
+    Results are cached in `session_cache`; unknown ids are cached for
+    SESSION_CACHE_NEGATIVE_TTL so garbage cookies don't reach Postgres.
+    Database errors are never cached. A cached session is only used while
+    the session listener is connected: without it this process would not
+    hear about a logout or demotion handled elsewhere.
+    """
+    session = session_cache.get(session_id)
+    if session is None:
         return None
+    if session is not MISSING and session_listener is not None and session_listener.connected.is_set():
+        return session
+    return load_session(session_id)
 
+@timed
+def load_session(session_id):
+    """get_session() on a cache miss: read the session and cache the result."""
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT s.*, u.email, u.is_admin 
-            FROM sessions s 
-            JOIN users u ON s.user_id = u.id 
-            WHERE s.session_id = %s AND s.expires_at > CURRENT_TIMESTAMP
-        """, (session_id,))
-        session = cur.fetchone()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute("""
+                SELECT s.*, u.email, u.is_admin 
+                FROM sessions s 
+                JOIN users u ON s.user_id = u.id 
+                WHERE s.session_id = %s AND s.expires_at > CURRENT_TIMESTAMP
+            """, (session_id,))
+            session = cur.fetchone()
+            cur.close()
+        session_cache.set(session_id, session)
         return session
     except Exception as e:
-        print(f"Error getting session: {e}")
-        conn.close()
+        log.error("Error getting session: %s", e)
         return None
 
+@timed
 def delete_session(session_id):
-    conn = get_db_connection()
-    if not conn:
-        return
+    session_cache.invalidate(session_id)
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM sessions WHERE session_id = %s", (session_id,))
+            invalidation.publish(cur, SESSION_CHANNEL, f"session:{session_id}")
+            conn.commit()
+            cur.close()
+    except Exception as e:
+        log.error("Error deleting session: %s", e)
+    finally:
+        # Drop again in case a concurrent lookup re-cached it before the DELETE committed
+        session_cache.invalidate(session_id)
 
+@timed
+def set_user_admin(user_id, is_admin=True):
     try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM sessions WHERE session_id = %s", (session_id,))
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("UPDATE users SET is_admin = %s WHERE id = %s", (is_admin, user_id))
+            invalidation.publish(cur, SESSION_CHANNEL, f"user:{user_id}")
+            conn.commit()
+            cur.close()
+        # Cached sessions carry is_admin, so they must be refreshed (other processes: via the notification)
+        session_cache.invalidate_where(lambda s: s is not None and s['user_id'] == user_id)
+        return True
     except Exception as e:
-        print(f"Error deleting session: {e}")
-        conn.close()
+        log.error("Error updating admin flag for user %s: %s", user_id, e)
+        return False
 
 # --- Product Management ---
 
-def get_all_products(include_inactive=False):
-    conn = get_db_connection()
-    if not conn:
-        return []
+# Columns product reads and writes return (and the API serves). Left out:
+# search_vector (search-index data, large) and description_hash (render cache key).
+PRODUCT_COLUMNS = "id, name, price, image, description, description_html, category, stock, is_active, created_at"
 
-    try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        query = "SELECT * FROM products"
-        if not include_inactive:
-            query += " WHERE is_active = TRUE"
-        query += " ORDER BY id ASC"
-        
-        cur.execute(query)
+def catalog_version():
+    return _catalog_version
+
+def bump_catalog_version():
+    global _catalog_version
+    with _catalog_version_lock:
+        _catalog_version += 1
+        return _catalog_version
+
+@timed
+def load_catalog():
+    """All products (active and inactive), ordered by id. Raises on DB errors."""
+    with db_connection() as conn:
+        cur = json_cursor(conn)
+        cur.execute(f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY id ASC")
         products = cur.fetchall()
         cur.close()
-        conn.close()
+    for product in products:
+        _with_html(product, "description", "description_html")
+    return products
+
+@timed
+def get_all_products(include_inactive=False):
+    try:
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            query = f"SELECT {PRODUCT_COLUMNS} FROM products"
+            if not include_inactive:
+                query += " WHERE is_active = TRUE"
+            query += " ORDER BY id ASC"
         
-        # Format types (Decimal to float) handled in server.py json_serial, 
-        # but good to be aware.
+            cur.execute(query)
+            products = cur.fetchall()
+            cur.close()
+
+        # price arrives as float (json_cursor), ready for serialization.dumps
+        for product in products:
+            _with_html(product, "description", "description_html")
         return products
     except Exception as e:
-        print(f"Error getting products: {e}")
-        conn.close()
+        log.error("Error getting products: %s", e)
         return []
 
+@timed
 def get_product(product_id):
-    conn = get_db_connection()
-    if not conn:
-        return None
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM products WHERE id = %s", (product_id,))
-        product = cur.fetchone()
-        cur.close()
-        conn.close()
-        return product
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            cur.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = %s", (product_id,))
+            product = cur.fetchone()
+            cur.close()
+        return _with_html(product, "description", "description_html")
     except Exception as e:
-        print(f"Error getting product {product_id}: {e}")
-        conn.close()
+        log.error("Error getting product %s: %s", product_id, e)
         return None
 
+@timed
 def create_product(data):
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("DB Connection failed")
-    
+    description_html, description_hash = markup.rendered(data.get('description', ''))
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            INSERT INTO products (name, price, image, description, category, stock, is_active)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING *
-        """, (
-            data.get('name'),
-            data.get('price'),
-            data.get('image'),
-            data.get('description', ''),
-            data.get('category', 'General'),
-            data.get('stock', 0),
-            data.get('is_active', True)
-        ))
-        product = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            cur.execute(f"""
+                INSERT INTO products (name, price, image, description, category, stock, is_active,
+                                      description_html, description_hash)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING {PRODUCT_COLUMNS}
+            """, (
+                data.get('name'),
+                data.get('price'),
+                data.get('image'),
+                data.get('description', ''),
+                data.get('category', 'General'),
+                data.get('stock', 0),
+                data.get('is_active', True),
+                description_html,
+                description_hash
+            ))
+            product = cur.fetchone()
+            conn.commit()
+            cur.close()
+        bump_catalog_version()
         return product
     except Exception as e:
-        print(f"Error creating product: {e}")
-        conn.close()
+        log.error("Error creating product: %s", e)
         raise e
 
+# Columns update_product() accepts from the admin form
+PRODUCT_EDITABLE = ('name', 'price', 'image', 'description', 'category', 'stock', 'is_active')
+
+@timed
 def update_product(product_id, data):
-    conn = get_db_connection()
-    if not conn:
-        raise Exception("DB Connection failed")
-    
-    try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Build dynamic query
-        fields = []
-        values = []
-        for key, value in data.items():
+    """Update the given PRODUCT_EDITABLE columns; None if the product doesn't exist.
+
+    Orders keep changing stock, so `stock` is compare-and-set: it must come
+    with `expected_stock` (the value the editor started from), and StockChanged
+    is raised if the stock is no longer that value. Leave `stock` out to keep it.
+    """
+    # Build dynamic query
+    fields = []
+    values = []
+    for key in PRODUCT_EDITABLE:
+        if key in data:
             fields.append(f"{key} = %s")
-            values.append(value)
-        
-        if not fields:
-            return None # Nothing to update
-            
-        values.append(product_id)
-        query = f"UPDATE products SET {', '.join(fields)} WHERE id = %s RETURNING *"
+            values.append(data[key])
         
-        cur.execute(query, tuple(values))
-        product = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+    if not fields:
+        return None # Nothing to update
+
+    conditions = ["id = %s"]
+    condition_values = [product_id]
+    if 'stock' in data:
+        if data.get('expected_stock') is None:
+            raise ValueError("expected_stock is required when changing stock")
+        conditions.append("stock = %s")
+        condition_values.append(int(data['expected_stock']))
+
+    try:
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            if 'description' in data:
+                _render_changed(cur, "products", product_id, data['description'],
+                                "description_html", "description_hash", fields, values)
+            query = (f"UPDATE products SET {', '.join(fields)} WHERE {' AND '.join(conditions)} "
+                     f"RETURNING {PRODUCT_COLUMNS}")
+            cur.execute(query, tuple(values + condition_values))
+            product = cur.fetchone()
+            if product is None and 'stock' in data:
+                cur.execute("SELECT stock FROM products WHERE id = %s", (product_id,))
+                row = cur.fetchone()
+                if row is not None:
+                    raise StockChanged(product_id, row['stock'])
+            conn.commit()
+            cur.close()
+        if product is not None:
+            bump_catalog_version()
         return product
+    except StockChanged:
+        raise
     except Exception as e:
-        print(f"Error updating product: {e}")
-        conn.close()
+        log.error("Error updating product: %s", e)
         raise e
 
 def delete_product(product_id):
     """Soft delete"""
     return update_product(product_id, {"is_active": False})
 
-def get_all_orders():
-    """Admin: Get all orders"""
-    conn = get_db_connection()
-    if not conn: return []
+ORDERS_PAGE_MAX = 200
+
+def encode_page_cursor(created_at, row_id):
+    """Opaque keyset cursor for pages ordered by (created_at, id) descending."""
+    raw = f"{created_at.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_page_cursor(cursor):
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("""
-            SELECT o.*, u.email as user_email 
-            FROM orders o 
-            LEFT JOIN users u ON o.user_id = u.id 
-            ORDER BY o.created_at DESC
-        """)
-        orders = cur.fetchall()
-        
-        # Get items for each order
-        for order in orders:
-             cur.execute("SELECT * FROM order_items WHERE order_id = %s", (order['id'],))
-             order['items'] = cur.fetchall()
-             
-        cur.close()
-        conn.close()
-        return orders
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+@timed
+def get_orders_page(limit=50, cursor=None, status=None, date_from=None, date_to=None,
+                    email=None, with_total=True):
+    """Admin: one page of orders, newest first, keyset-paginated on (created_at, id).
+
+    `date_from` / `date_to` are inclusive `date`s, `email` is a case-insensitive
+    substring match. Returns {"orders", "next_cursor", "total"}; `total` is None
+    when `with_total` is False so the COUNT(*) can be skipped.
+    """
+    limit = max(1, min(int(limit), ORDERS_PAGE_MAX))
+
+    conditions = []
+    params = []
+    if status:
+        conditions.append("o.status = %s")
+        params.append(status)
+    if date_from:
+        conditions.append("o.created_at >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("o.created_at < %s")
+        params.append(date_to + timedelta(days=1))
+    if email:
+        escaped = email.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("u.email ILIKE %s")
+        params.append(f"%{escaped}%")
+
+    filter_sql = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if cursor:
+        created_at, order_id = decode_page_cursor(cursor)
+        page_conditions.append("(o.created_at, o.id) < (%s, %s)")
+        page_params.extend([created_at, order_id])
+    page_sql = (" WHERE " + " AND ".join(page_conditions)) if page_conditions else ""
+
+    try:
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            cur.execute(f"""
+                SELECT o.id, o.user_id, o.total_amount, o.status, o.created_at, u.email as user_email
+                FROM orders o
+                LEFT JOIN users u ON o.user_id = u.id
+                {page_sql}
+                ORDER BY o.created_at DESC, o.id DESC
+                LIMIT %s
+            """, tuple(page_params) + (limit + 1,))
+            orders = cur.fetchall()
+
+            next_cursor = None
+            if len(orders) > limit:
+                orders = orders[:limit]
+                last = orders[-1]
+                next_cursor = encode_page_cursor(last['created_at'], last['id'])
+
+            _attach_order_items(cur, orders)
+
+            total = None
+            if with_total:
+                cur.execute(f"""
+                    SELECT COUNT(*) AS total
+                    FROM orders o
+                    LEFT JOIN users u ON o.user_id = u.id
+                    {filter_sql}
+                """, tuple(params))
+                total = cur.fetchone()['total']
+            cur.close()
+        return {"orders": orders, "next_cursor": next_cursor, "total": total}
     except Exception as e:
-        print(f"Error getting all orders: {e}")
-        conn.close()
-        return []
+        log.error("Error getting orders page: %s", e)
+        raise e
 
+@timed
 def update_order_status(order_id, status):
-    conn = get_db_connection()
-    if not conn: return None
+    """Change an order's status, releasing its stock on cancellation.
+
+    Un-cancelling reserves the stock again and may raise InsufficientStock.
+    Orders placed before stock reservation (stock_reserved is false) never
+    took stock, so their stock is left alone either way.
+    """
     try:
-        cur = conn.cursor()
-        cur.execute("UPDATE orders SET status = %s WHERE id = %s", (status, order_id))
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            # Lock the order so concurrent status changes can't release its stock twice
+            cur.execute("SELECT status, stock_reserved FROM orders WHERE id = %s FOR UPDATE", (order_id,))
+            row = cur.fetchone()
+            if row is None:
+                cur.close()
+                return False
+            previous, stock_reserved = row
+            if stock_reserved and previous != status and CANCELLED_STATUS in (previous, status):
+                lines = inventory.order_lines(conn, order_id)
+                if status == CANCELLED_STATUS:
+                    inventory.release(conn, lines)
+                else:
+                    inventory.reserve(conn, lines)
+            cur.execute("UPDATE orders SET status = %s WHERE id = %s", (status, order_id))
+            conn.commit()
+            cur.close()
         return True
+    except InsufficientStock:
+        raise
     except Exception as e:
-        print(f"Error updating order status: {e}")
-        conn.close()
+        log.error("Error updating order status: %s", e)
         return False
 
+# --- Markdown stored as HTML (see markup.py) ---
+
+# (table, Markdown column, HTML column, source hash column)
+RENDERED_COLUMNS = (
+    ("blog_posts", "content", "content_html", "content_hash"),
+    ("products", "description", "description_html", "description_hash"),
+)
+
+def _with_html(row, source, html_column):
+    """Rows not rendered yet (saved before migration 0003) get their HTML in memory."""
+    if row is not None and row.get(html_column) is None:
+        row[html_column] = markup.render(row.get(source))
+    return row
+
+def _render_changed(cur, table, row_id, text, html_column, hash_column, fields, values):
+    """Add the HTML columns to an UPDATE, unless the stored HTML already matches `text`.
+
+    Locks the row first so two concurrent edits cannot store HTML for each other's source.
+    """
+    cur.execute(f"SELECT {hash_column} AS hash FROM {table} WHERE id = %s FOR UPDATE", (row_id,))
+    row = cur.fetchone()
+    current = row["hash"] if row else None
+    result = markup.rendered(text, current)
+    if result is not None:
+        fields += [f"{html_column} = %s", f"{hash_column} = %s"]
+        values += list(result)
+
+def render_stored_markdown(force=False, batch_size=200):
+    """Render rows whose HTML is missing or stale (source or RENDERER_VERSION changed).
+
+    Returns {table: (rows checked, rows rendered)}. With force=True every row is rendered again.
+    """
+    results = {}
+    for table, source, html_column, hash_column in RENDERED_COLUMNS:
+        checked = rendered = 0
+        last_id = 0
+        while True:
+            with db_connection() as conn:
+                cur = conn.cursor()
+                cur.execute(f"SELECT id, {source}, {hash_column} FROM {table} WHERE id > %s ORDER BY id LIMIT %s",
+                            (last_id, batch_size))
+                rows = cur.fetchall()
+                ids, sources, htmls, hashes = [], [], [], []
+                for row_id, text, current in rows:
+                    result = markup.rendered(text, None if force else current)
+                    if result is not None:
+                        ids.append(row_id)
+                        sources.append(text)
+                        htmls.append(result[0])
+                        hashes.append(result[1])
+                if ids:
+                    # The source check skips rows edited since the SELECT; their update rendered them already
+                    cur.execute(f"""
+                        UPDATE {table} t SET {html_column} = u.html, {hash_column} = u.hash
+                        FROM unnest(%s::int[], %s::text[], %s::text[], %s::text[]) AS u(id, source, html, hash)
+                        WHERE t.id = u.id AND t.{source} IS NOT DISTINCT FROM u.source
+                    """, (ids, sources, htmls, hashes))
+                    rendered += cur.rowcount
+                conn.commit()
+                cur.close()
+            checked += len(rows)
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1][0]
+        results[table] = (checked, rendered)
+        if table == "products" and rendered:
+            bump_catalog_version()
+    return results
+
+# --- Search ---
+
+SEARCH_LIMIT_MAX = 50
+
+# kind -> (table, columns returned, visibility condition)
+SEARCH_SOURCES = {
+    "products": ("products", "id, name, price, image, category", "is_active"),
+    "posts": ("blog_posts",
+              "id, title, slug, image, COALESCE(NULLIF(summary, ''), left(content, 160)) AS excerpt, created_at",
+              "is_published"),
+}
+
+def _search_tsquery(terms, prefix=False):
+    """SQL for a tsquery matching all terms, each as a Turkish stem or a folded word.
+    With `prefix` the last term also matches as the start of a folded word (from
+    SEARCH_MIN_PREFIX letters on). See migrations/0005_search.sql for what the
+    documents contain."""
+    parts = []
+    for i, term in enumerate(terms):
+        expand = prefix and i == len(terms) - 1 and len(term) >= SEARCH_MIN_PREFIX
+        suffix = " || ':*'" if expand else ""
+        parts.append(f"(to_tsquery('turkish', %s) || to_tsquery('simple', vetaris_fold(%s){suffix}))")
+    return "(" + " && ".join(parts) + ")", [t for term in terms for t in (term, term)]
+
+@timed
+def search(query, kinds=("products", "posts"), limit=10, prefix=False):
+    """Active products and published posts matching every word of `query`, best first.
+
+    Returns {kind: [rows with a "rank"]}. Every match is ranked. With `prefix`
+    (type-ahead) the last word may be incomplete; a short prefix can match much
+    of a table, so only the first SEARCH_MAX_CANDIDATES matches are ranked.
+    """
+    limit = max(1, min(int(limit), SEARCH_LIMIT_MAX))
+    unknown = [k for k in kinds if k not in SEARCH_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown search types: {', '.join(unknown)}")
+    results = {kind: [] for kind in kinds}
+    terms = textfold.search_terms(query)
+    if not terms:
+        return results
+
+    tsquery, params = _search_tsquery(terms, prefix)
+    try:
+        with db_connection() as conn:
+            cur = json_cursor(conn)
+            for kind in kinds:
+                table, columns, visible = SEARCH_SOURCES[kind]
+                # The tsquery is written out twice (not joined in from a subquery) so the
+                # planner sees a constant and can estimate how selective it is
+                ranked = f"""
+                    SELECT {columns}, ts_rank(search_vector, {tsquery}, 1) AS rank
+                    FROM {table}
+                    WHERE search_vector @@ {tsquery} AND {visible}
+                """
+                if prefix:
+                    # The CTE is planned for all its rows, as if there were no cap: a LIMIT
+                    # next to the scan would invite a sequential scan expected to stop early,
+                    # which reads the whole table when few rows match. It is still read
+                    # lazily, so ranking stops after the cap.
+                    cur.execute(f"""
+                        WITH matches AS MATERIALIZED ({ranked})
+                        SELECT * FROM (SELECT * FROM matches LIMIT %s) m
+                        ORDER BY rank DESC, id DESC
+                        LIMIT %s
+                    """, tuple(params) * 2 + (SEARCH_MAX_CANDIDATES, limit))
+                else:
+                    cur.execute(ranked + " ORDER BY rank DESC, id DESC LIMIT %s", tuple(params) * 2 + (limit,))
+                results[kind] = cur.fetchall()
+            cur.close()
+        return results
+    except Exception as e:
+        log.error("Error searching for %r: %s", query, e)
+        raise e
+
 # --- Blog Management ---
 
-def get_all_posts(public_only=False):
-    conn = get_db_connection()
-    if not conn: return []
+# Columns a single post is returned with (see PRODUCT_COLUMNS; content_hash stays internal too)
+POST_COLUMNS = "id, title, slug, content, content_html, image, summary, created_at, is_published"
+
+POSTS_PAGE_MAX = 50
+
+# Columns a post listing may ask for (fields=...). The Markdown body is not among them:
+# lists never read it, so their cost does not grow with the length of the posts.
+POST_LIST_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "slug": "slug",
+    "image": "image",
+    "summary": "summary",
+    # Card text: the summary, or the start of the post when there is none
+    "excerpt": "COALESCE(NULLIF(summary, ''), left(content, 160))",
+    "created_at": "created_at",
+    "is_published": "is_published",
+}
+POST_LIST_DEFAULT_FIELDS = ("id", "title", "slug", "image", "excerpt", "created_at", "is_published")
+
+@timed
+def get_posts_page(limit=12, cursor=None, public_only=False, fields=None):
+    """One page of posts, newest first, keyset-paginated on (created_at, id).
+
+    `fields` picks columns from POST_LIST_COLUMNS (ValueError for anything
+    else); id and created_at are always included since the cursor needs them.
+    Returns {"posts", "next_cursor"}.
+    """
+    limit = max(1, min(int(limit), POSTS_PAGE_MAX))
+    fields = list(fields or POST_LIST_DEFAULT_FIELDS)
+    unknown = [f for f in fields if f not in POST_LIST_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    for required in ("created_at", "id"):
+        if required not in fields:
+            fields.insert(0, required)
+    columns = ", ".join(f"{POST_LIST_COLUMNS[f]} AS {f}" for f in fields)
+
+    conditions = []
+    params = []
+    if public_only:
+        conditions.append("is_published = TRUE")
+    if cursor:
+        created_at, post_id = decode_page_cursor(cursor)
+        conditions.append("(created_at, id) < (%s, %s)")
+        params.extend([created_at, post_id])
+    where_sql = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        query = "SELECT * FROM blog_posts"
-        if public_only:
-            query += " WHERE is_published = TRUE"
-        query += " ORDER BY created_at DESC"
-        cur.execute(query)
-        posts = cur.fetchall()
-        cur.close()
-        conn.close()
-        return posts
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(f"""
+                SELECT {columns}
+                FROM blog_posts
+                {where_sql}
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """, tuple(params) + (limit + 1,))
+            posts = cur.fetchall()
+            cur.close()
+
+        next_cursor = None
+        if len(posts) > limit:
+            posts = posts[:limit]
+            last = posts[-1]
+            next_cursor = encode_page_cursor(last['created_at'], last['id'])
+        return {"posts": posts, "next_cursor": next_cursor}
     except Exception as e:
-        print(f"Error fetching posts: {e}")
-        conn.close()
-        return []
+        log.error("Error fetching posts: %s", e)
+        raise e
 
+@timed
 def get_post(post_id):
-    conn = get_db_connection()
-    if not conn: return None
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        # Check if ID is int or slug
-        if str(post_id).isdigit():
-             cur.execute("SELECT * FROM blog_posts WHERE id = %s", (int(post_id),))
-        else:
-             cur.execute("SELECT * FROM blog_posts WHERE slug = %s", (post_id,))
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            # Check if ID is int or slug
+            if str(post_id).isdigit():
+                 cur.execute(f"SELECT {POST_COLUMNS} FROM blog_posts WHERE id = %s", (int(post_id),))
+            else:
+                 cur.execute(f"SELECT {POST_COLUMNS} FROM blog_posts WHERE slug = %s", (post_id,))
              
-        post = cur.fetchone()
-        cur.close()
-        conn.close()
-        return post
+            post = cur.fetchone()
+            cur.close()
+        return _with_html(post, "content", "content_html")
     except Exception as e:
-        print(f"Error fetching post {post_id}: {e}")
-        conn.close()
+        log.error("Error fetching post %s: %s", post_id, e)
         return None
 
+@timed
 def create_post(data):
-    conn = get_db_connection()
-    if not conn: return None
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        slug = data.get('title').lower().replace(' ', '-').replace('ç','c').replace('ğ','g').replace('ı','i').replace('ö','o').replace('ş','s').replace('ü','u')
-        # Simple slug deduplication could be added here
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            slug = textfold.slugify(data.get('title'))
+            # Simple slug deduplication could be added here
+            content_html, content_hash = markup.rendered(data.get('content'))
         
-        cur.execute("""
-            INSERT INTO blog_posts (title, slug, content, image, summary, is_published)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING *
-        """, (
-            data.get('title'),
-            slug,
-            data.get('content'),
-            data.get('image'),
-            data.get('summary', ''),
-            data.get('is_published', True)
-        ))
-        post = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+            cur.execute(f"""
+                INSERT INTO blog_posts (title, slug, content, image, summary, is_published, content_html, content_hash)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING {POST_COLUMNS}
+            """, (
+                data.get('title'),
+                slug,
+                data.get('content'),
+                data.get('image'),
+                data.get('summary', ''),
+                data.get('is_published', True),
+                content_html,
+                content_hash
+            ))
+            post = cur.fetchone()
+            conn.commit()
+            cur.close()
         return post
     except Exception as e:
-        print(f"Error creating post: {e}")
-        conn.close()
+        log.error("Error creating post: %s", e)
         raise e
 
+@timed
 def update_post(post_id, data):
-    conn = get_db_connection()
-    if not conn: return None
-    try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        fields = []
-        values = []
-        for key, value in data.items():
-            if key in ['title', 'content', 'image', 'summary', 'is_published']:
-                fields.append(f"{key} = %s")
-                values.append(value)
-        
-        if not fields: return None
+    fields = []
+    values = []
+    for key, value in data.items():
+        if key in ['title', 'content', 'image', 'summary', 'is_published']:
+            fields.append(f"{key} = %s")
+            values.append(value)
         
-        values.append(post_id)
-        # Safe dynamic query
-        query = f"UPDATE blog_posts SET {', '.join(fields)} WHERE id = %s RETURNING *"
-        cur.execute(query, tuple(values))
+    if not fields: return None
 
-        post = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+    try:
+        with db_connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            if 'content' in data:
+                _render_changed(cur, "blog_posts", post_id, data['content'],
+                                "content_html", "content_hash", fields, values)
+            values.append(post_id)
+            # Safe dynamic query
+            query = f"UPDATE blog_posts SET {', '.join(fields)} WHERE id = %s RETURNING {POST_COLUMNS}"
+            cur.execute(query, tuple(values))
+
+            post = cur.fetchone()
+            conn.commit()
+            cur.close()
         return post
     except Exception as e:
-        print(f"Error updating post: {e}")
-        conn.close()
+        log.error("Error updating post: %s", e)
         raise e
 
+@timed
 def delete_post(post_id):
-    conn = get_db_connection()
-    if not conn: return False
     try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM blog_posts WHERE id = %s", (post_id,))
-        conn.commit()
-        cur.close()
-        conn.close()
+        with db_connection() as conn:
+            cur = conn.cursor()
+            cur.execute("DELETE FROM blog_posts WHERE id = %s", (post_id,))
+            conn.commit()
+            cur.close()
         return True
     except Exception as e:
-        print(f"Error deleting post: {e}")
-        conn.close()
+        log.error("Error deleting post: %s", e)
         return False
-
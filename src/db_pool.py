@@ -0,0 +1,302 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that goes back to its pool on close().
+
+    Legacy callers (and the maintenance scripts) do `conn = get_db_connection()`
+    ... `conn.close()`; with this subclass that pattern returns the connection
+    to the pool instead of tearing down the TCP session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        self._created_at = time.monotonic()
+        self._last_used = self._created_at
+        self._checked_out = False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.putconn(self)
+        else:
+            super().close()
+
+    def _real_close(self):
+        self._pool = None
+        if not self.closed:
+            super().close()
+
+
+class ConnectionPool:
+    """Thread-safe, bounded PostgreSQL connection pool.
+
+    - keeps at least `minconn` and at most `maxconn` connections open
+    - checkout blocks up to `timeout` seconds when the pool is exhausted
+    - connections idle for more than `health_check_after` seconds are pinged
+      (SELECT 1) before being handed out
+    - connections older than `max_age` are recycled, idle ones beyond
+      `minconn` are closed after `max_idle` seconds
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=5.0, max_age=1800.0,
+                 max_idle=300.0, health_check_after=30.0, connection_factory=PooledConnection,
+                 **connect_kwargs):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("Invalid pool size (min=%s, max=%s)" % (minconn, maxconn))
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_age = max_age
+        self.max_idle = max_idle
+        self.health_check_after = health_check_after
+        self._connection_factory = connection_factory  # PooledConnection or a subclass
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []  # LIFO stack, most recently used at the end
+        self._in_use = 0
+        self._opening = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Counters
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for _ in range(minconn):
+            try:
+                conn = self._connect()
+            except psycopg2.Error:
+                break
+            self._idle.append(conn)
+
+    # --- Internals ---
+
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=self._connection_factory, **self._connect_kwargs)
+        conn._pool = self
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _discard(self, conn):
+        with self._cond:
+            self._discarded += 1
+        try:
+            conn._real_close()
+        except Exception:
+            pass
+
+    def _is_expired(self, conn, now):
+        return self.max_age and now - conn._created_at > self.max_age
+
+    def _is_healthy(self, conn, now):
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if now - conn._last_used < self.health_check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap_locked(self, now):
+        """Pop connections that are too old or idle too long. Caller holds the lock."""
+        stale = []
+        keep = []
+        total = len(self._idle) + self._in_use + self._opening
+        # Oldest idle entries are at the front of the stack
+        for conn in self._idle:
+            too_idle = self.max_idle and now - conn._last_used > self.max_idle
+            if self._is_expired(conn, now) or conn.closed or (too_idle and total > self.minconn):
+                stale.append(conn)
+                total -= 1
+            else:
+                keep.append(conn)
+        self._idle = keep
+        return stale
+
+    # --- Public API ---
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            conn = None
+            must_open = False
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                stale = self._reap_locked(time.monotonic())
+                while True:
+                    if self._idle:
+                        conn = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._in_use + self._opening < self.maxconn:
+                        self._opening += 1
+                        must_open = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout("Timed out after %.1fs waiting for a database connection" % timeout)
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            for old in stale:
+                self._discard(old)
+
+            if must_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use += 1
+            elif not self._is_healthy(conn, time.monotonic()):
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                self._discard(conn)
+                continue
+
+            conn._checked_out = True
+            waited = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            return conn
+
+    def putconn(self, conn, discard=False):
+        if not conn._checked_out:
+            return  # already returned (e.g. close() called twice)
+        conn._checked_out = False
+        now = time.monotonic()
+        if not discard and not conn.closed:
+            try:
+                # Never hand out a connection with an open or aborted transaction
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if conn.closed or self._is_expired(conn, now):
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if not discard and not self._closed:
+                conn._last_used = now
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Check out a connection for the duration of a `with` block.
+
+        The connection is returned to the pool on exit; if the block raised,
+        any open transaction is rolled back first.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    def reap(self):
+        """Close idle connections that exceeded max_idle / max_age."""
+        with self._cond:
+            stale = self._reap_locked(time.monotonic())
+        for conn in stale:
+            self._discard(conn)
+        return len(stale)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": len(self._idle) + self._in_use,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "wait_time_total": round(self._wait_total, 6),
+                "wait_time_max": round(self._wait_max, 6),
+                "wait_time_avg": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            }
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn._real_close()
+            except Exception:
+                pass
+
+
+class PoolReaper(threading.Thread):
+    """Daemon thread that periodically trims idle/expired connections."""
+
+    def __init__(self, pool, interval=60.0):
+        super().__init__(name="db-pool-reaper", daemon=True)
+        self.pool = pool
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.pool.reap()
+            except Exception:
+                pass
+
+    def stop(self):
+        self._stop_event.set()
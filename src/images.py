@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import threading
+import time
+
+# Responsive image derivatives (written by build_images.py, picked by the server)
+IMAGE_WIDTHS = (320, 640, 960, 1280)
+DERIVED_DIR = "images/derived"          # relative to the public directory
+MANIFEST_NAME = "manifest.json"
+MANIFEST_CHECK_INTERVAL = 5.0           # seconds between manifest mtime checks in the server
+
+# Quality settings per output format
+FORMAT_OPTIONS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 78, "method": 6},
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+}
+# Content negotiation order: best compression first; the last entry is always acceptable
+NEGOTIATION_ORDER = (("avif", "image/avif"), ("webp", "image/webp"), ("jpeg", None), ("png", None))
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def variant_name(digest, width, fmt):
+    """Content-addressed file name: same source bytes + params -> same file."""
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return f"{digest[:24]}-{width}.{ext}"
+
+
+def available_formats():
+    """Output formats the installed Pillow can write."""
+    from PIL import features
+    formats = ["jpeg", "png"]
+    if features.check("webp"):
+        formats.append("webp")
+    if features.check("avif"):
+        formats.append("avif")
+    return formats
+
+
+def generate_variants(source_path, digest, out_dir, formats):
+    """Write every width/format derivative of one source image.
+
+    Runs in a worker process. Returns {"width", "height", "variants": {fmt: {width: name}}}.
+    Images with transparency get PNG instead of JPEG as the universal fallback.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as img:
+        img = ImageOps.exif_transpose(img)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        orig_w, orig_h = img.size
+
+        widths = [w for w in IMAGE_WIDTHS if w < orig_w]
+        if orig_w <= IMAGE_WIDTHS[-1]:
+            widths.append(orig_w)  # never upscale; keep the original size as the top variant
+        variants = {}
+        for fmt in formats:
+            if fmt == "jpeg" and has_alpha:
+                continue
+            if fmt == "png" and not has_alpha:
+                continue
+            variants[fmt] = {}
+            for width in widths:
+                name = variant_name(digest, width, fmt)
+                target = os.path.join(out_dir, name)
+                if not os.path.exists(target):
+                    height = max(1, round(orig_h * width / orig_w))
+                    resized = img if width == orig_w else img.resize((width, height), Image.LANCZOS)
+                    tmp = target + ".tmp"
+                    resized.save(tmp, format=fmt.upper(), **FORMAT_OPTIONS[fmt])
+                    os.replace(tmp, target)
+                variants[fmt][str(width)] = name
+    return {"width": orig_w, "height": orig_h, "variants": variants}
+
+
+def accepted_image_types(accept_header):
+    accept = (accept_header or "").lower()
+    return {mime for _, mime in NEGOTIATION_ORDER if mime and mime in accept}
+
+
+class ImageVariants:
+    """Reads the derivative manifest and picks a variant for (path, width, Accept)."""
+
+    def __init__(self, public_dir):
+        self.public_dir = public_dir
+        self.manifest_path = os.path.join(public_dir, *DERIVED_DIR.split('/'), MANIFEST_NAME)
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        now = time.monotonic()
+        if now - self._checked_at < MANIFEST_CHECK_INTERVAL:
+            return self._manifest
+        with self._lock:
+            if now - self._checked_at < MANIFEST_CHECK_INTERVAL:
+                return self._manifest
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.manifest_path).st_mtime_ns
+            except OSError:
+                self._manifest, self._manifest_mtime = {}, None
+                return self._manifest
+            if mtime != self._manifest_mtime:
+                try:
+                    with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                        self._manifest = json.load(f)
+                    self._manifest_mtime = mtime
+                except (OSError, ValueError):
+                    pass  # keep the previous manifest if a build is mid-write
+        return self._manifest
+
+    def pick(self, url_path, width, accept_header):
+        """URL path of the best derivative, or None if the image has none."""
+        entry = self._load().get(url_path)
+        if not entry:
+            return None
+        accepted = accepted_image_types(accept_header)
+        for fmt, mime in NEGOTIATION_ORDER:
+            sizes = entry["variants"].get(fmt)
+            if not sizes or (mime and mime not in accepted):
+                continue
+            # Smallest variant at least as wide as requested, else the largest one
+            candidates = sorted(int(w) for w in sizes)
+            chosen = next((w for w in candidates if w >= width), candidates[-1])
+            return "/" + DERIVED_DIR + "/" + sizes[str(chosen)]
+        return None
@@ -0,0 +1,64 @@
+import select
+import logging
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+log = logging.getLogger("vetaris.invalidation")
+
+# Notice a silently dropped connection (no FIN, e.g. a failover) within about a minute
+KEEPALIVE_OPTIONS = {"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, "keepalives_count": 3}
+
+
+def publish(cur, channel, payload):
+    """Notify every listener on `channel`; Postgres delivers it when the transaction commits."""
+    cur.execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
+
+class Listener(threading.Thread):
+    """Daemon thread that LISTENs on `channel` over its own connection and
+    passes each payload to `handle`.
+
+    `connected` is set only while notifications can arrive. Anything sent
+    while the connection was down is lost, so `reset` runs every time the
+    connection is (re)established.
+    """
+
+    def __init__(self, channel, handle, reset, retry=1.0, **connect_kwargs):
+        super().__init__(name=f"listen-{channel}", daemon=True)
+        self.channel = channel
+        self.handle = handle
+        self.reset = reset
+        self.retry = retry
+        self.connect_kwargs = {**KEEPALIVE_OPTIONS, **connect_kwargs}
+        self.connected = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.connect_kwargs)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {self.channel}")
+                cur.close()
+                self.reset()
+                self.connected.set()
+                log.info("Listening on %s", self.channel)
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], 5.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self.handle(conn.notifies.pop(0).payload)
+            except Exception as e:
+                log.warning("Listener on %s failed, retrying: %s", self.channel, e)
+            finally:
+                self.connected.clear()
+                if conn is not None:
+                    conn.close()
+            self._stop_event.wait(self.retry)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,117 @@
+CANCELLED_STATUS = "İptal"  # orders in this status hold no stock
+
+
+class InsufficientStock(Exception):
+    """Not every line could be reserved; nothing was reserved.
+
+    `shortfalls` is a list of {"product_id", "requested", "available"}.
+    """
+
+    def __init__(self, shortfalls):
+        super().__init__("Insufficient stock")
+        self.shortfalls = shortfalls
+
+
+class StockChanged(Exception):
+    """An admin stock edit was based on a stock level that has since changed.
+
+    `current` is the stock now, so the editor can show it and retry.
+    """
+
+    def __init__(self, product_id, current):
+        super().__init__("Stock changed since it was read")
+        self.product_id = product_id
+        self.current = current
+
+
+# Row locks are always taken in product id order (the ORDER BY sits below the
+# lock step), so two carts touching the same products can't deadlock.
+_RESERVE_SQL = """
+    WITH req AS (
+        SELECT * FROM unnest(%s::int[], %s::int[]) AS r(product_id, quantity)
+    ), locked AS MATERIALIZED (
+        SELECT p.id, p.stock
+        FROM products p
+        WHERE p.id IN (SELECT product_id FROM req)
+        ORDER BY p.id
+        FOR UPDATE
+    ), upd AS (
+        UPDATE products p
+        SET stock = p.stock - req.quantity
+        FROM req, locked
+        WHERE p.id = req.product_id
+          AND locked.id = p.id
+          AND NOT EXISTS (
+              SELECT 1 FROM req r2 LEFT JOIN locked l2 ON l2.id = r2.product_id
+              WHERE l2.id IS NULL OR COALESCE(l2.stock, 0) < r2.quantity
+          )
+        RETURNING p.id
+    )
+    SELECT req.product_id, req.quantity, COALESCE(locked.stock, 0), upd.id IS NOT NULL
+    FROM req
+    LEFT JOIN locked ON locked.id = req.product_id
+    LEFT JOIN upd ON upd.id = req.product_id
+"""
+
+_RELEASE_SQL = """
+    WITH req AS (
+        SELECT * FROM unnest(%s::int[], %s::int[]) AS r(product_id, quantity)
+    ), locked AS MATERIALIZED (
+        SELECT p.id
+        FROM products p
+        WHERE p.id IN (SELECT product_id FROM req)
+        ORDER BY p.id
+        FOR UPDATE
+    )
+    UPDATE products p
+    SET stock = p.stock + req.quantity
+    FROM req, locked
+    WHERE p.id = req.product_id AND locked.id = p.id
+"""
+
+
+def _arrays(lines):
+    ids = sorted(lines)
+    return ids, [lines[i] for i in ids]
+
+
+def reserve(conn, lines):
+    """Take `lines` ({product_id: quantity}) out of stock, all or nothing.
+
+    One statement inside the caller's transaction; the row locks are held
+    until it commits, so keep that short. Raises InsufficientStock.
+    """
+    if not lines:
+        return
+    cur = conn.cursor()
+    cur.execute(_RESERVE_SQL, _arrays(lines))
+    rows = cur.fetchall()
+    cur.close()
+    if all(reserved for _, _, _, reserved in rows):
+        return
+    raise InsufficientStock([
+        {"product_id": product_id, "requested": quantity, "available": available}
+        for product_id, quantity, available, _ in rows
+        if available < quantity
+    ])
+
+
+def release(conn, lines):
+    """Put `lines` back into stock (cancelled order)."""
+    if not lines:
+        return
+    cur = conn.cursor()
+    cur.execute(_RELEASE_SQL, _arrays(lines))
+    cur.close()
+
+
+def order_lines(conn, order_id):
+    """{product_id: quantity} held by an order."""
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT product_id, SUM(quantity) FROM order_items WHERE order_id = %s GROUP BY product_id",
+        (order_id,)
+    )
+    lines = {product_id: int(quantity) for product_id, quantity in cur.fetchall()}
+    cur.close()
+    return lines
@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+
+import metrics
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")                          # "json" (one object per line) or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))            # records waiting for the writer thread
+LOG_ACCESS_SAMPLE = float(os.getenv("LOG_ACCESS_SAMPLE", "1.0"))      # share of ordinary requests logged
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "500"))  # slower requests are always logged
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+access_log = logging.getLogger("vetaris.access")
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, pid, msg, extra fields, exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + ".%03dZ" % record.msecs,
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread; never blocks the caller.
+
+    When the queue is full the record is dropped and counted in
+    vetaris_log_records_dropped_total.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        # Arguments may be mutable objects; resolve the message (and any
+        # traceback) now, on the calling thread. Formatting happens in the writer.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.LOG_DROPPED.inc()
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # wait for room: shutdown must not lose the queued records
+
+
+class _StreamWriter(logging.StreamHandler):
+    """Flushes only once the queue is drained, so a burst of records is one write()."""
+
+    def __init__(self, stream, pending):
+        super().__init__(stream)
+        self._pending = pending
+
+    def flush(self):
+        if self._pending.empty():
+            super().flush()
+
+
+def setup(fmt=LOG_FORMAT, level=LOG_LEVEL, stream=None):
+    """Route the root logger through a bounded queue to one writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+    pending = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    writer = _StreamWriter(stream or sys.stdout, pending)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    root = logging.getLogger()
+    root.handlers[:] = [DroppingQueueHandler(pending)]
+    root.setLevel(level)
+    _listener = _Listener(pending, writer)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Write out whatever is still queued and stop the writer thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def log_access(status, duration, **fields):
+    """Access log record. Errors and slow requests are always logged, the
+    rest with probability LOG_ACCESS_SAMPLE (stored as sample_rate)."""
+    if not access_log.isEnabledFor(logging.INFO):
+        return
+    duration_ms = duration * 1000.0
+    sampled = (status or 0) < 400 and duration_ms < LOG_SLOW_REQUEST_MS
+    if sampled and LOG_ACCESS_SAMPLE < 1.0 and random.random() >= LOG_ACCESS_SAMPLE:
+        return
+    fields["status"] = status
+    fields["duration_ms"] = round(duration_ms, 2)
+    fields["sample_rate"] = LOG_ACCESS_SAMPLE if sampled else 1.0
+    access_log.info("request", extra=fields)
@@ -0,0 +1,41 @@
+import hashlib
+import threading
+
+import nh3
+from markdown_it import MarkdownIt
+
+# Part of every source hash: bump it when the renderer or its settings change
+# and render_markdown.py will re-render every stored document
+RENDERER_VERSION = "1"
+
+LINK_REL = "noopener noreferrer"
+
+_local = threading.local()
+
+
+def _parser():
+    md = getattr(_local, "md", None)
+    if md is None:
+        # breaks: single newlines become <br>, as the old client-side rendering did.
+        # Raw HTML is allowed through the parser and then sanitized by nh3.
+        md = _local.md = MarkdownIt("commonmark", {"breaks": True, "html": True}).enable(["table", "strikethrough"])
+    return md
+
+
+def source_hash(text):
+    return hashlib.sha256(f"{RENDERER_VERSION}\n{text or ''}".encode("utf-8")).hexdigest()
+
+
+def render(text):
+    """Markdown -> sanitized HTML (scripts, event handlers and unsafe URLs removed)."""
+    if not text:
+        return ""
+    return nh3.clean(_parser().render(text), link_rel=LINK_REL)
+
+
+def rendered(text, current_hash=None):
+    """(html, hash) for `text`, or None when `current_hash` shows the stored HTML is current."""
+    digest = source_hash(text)
+    if digest == current_hash:
+        return None
+    return render(text), digest
@@ -0,0 +1,294 @@
+import os
+import json
+import errno
+import bisect
+import logging
+import threading
+
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))  # seconds between worker snapshots
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # if set, /metrics wants "Authorization: Bearer <token>"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BCRYPT_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = {}  # metric name -> metric, in definition order
+
+# Every thread records into its own dict, so the hot path takes no lock.
+# Readers copy the dicts and add them up.
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+
+log = logging.getLogger("vetaris.metrics")
+
+_dir = None  # shared snapshot directory when running under the prefork supervisor
+
+
+def _values():
+    """This thread's {(metric name, label values): cell}. Only this thread writes to it."""
+    try:
+        return _local.values
+    except AttributeError:
+        values = _local.values = {}
+        with _shards_lock:
+            _shards.append(values)
+        return values
+
+
+def _format(value):
+    return "+Inf" if value == float("inf") else str(value)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Child:
+    """A metric with its label values bound, for call sites with fixed labels."""
+    __slots__ = ("metric", "labels")
+
+    def __init__(self, metric, labels):
+        self.metric = metric
+        self.labels = labels
+
+    def inc(self, amount=1):
+        self.metric.inc(amount, self.labels)
+
+    def dec(self, amount=1):
+        self.metric.dec(amount, self.labels)
+
+    def observe(self, value):
+        self.metric.observe(value, self.labels)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        if name in REGISTRY:
+            raise ValueError(f"Duplicate metric {name}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return _Child(self, tuple(str(v) for v in values))
+
+    def _pairs(self, labels, extra=None):
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self, lines, labels, cell):
+        lines.append(f"{self.name}{self._pairs(labels)} {_format(cell[0])}")
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, labels=()):
+        values = _values()
+        key = (self.name, labels)
+        cell = values.get(key)
+        if cell is None:
+            values[key] = [amount]
+        else:
+            cell[0] += amount
+
+
+class Gauge(Counter):
+    """Summed over threads and live worker processes (e.g. requests in flight)."""
+    kind = "gauge"
+
+    def dec(self, amount=1, labels=()):
+        self.inc(-amount, labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        values = _values()
+        key = (self.name, labels)
+        cell = values.get(key)
+        if cell is None:
+            # one count per bucket (not cumulative) + one for +Inf, then the sum
+            cell = values[key] = [0] * (len(self.buckets) + 2)
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def render(self, lines, labels, cell):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), cell):
+            cumulative += count
+            le = 'le="%s"' % _format(bound)
+            lines.append(f"{self.name}_bucket{self._pairs(labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._pairs(labels)} {_format(cell[-1])}")
+        lines.append(f"{self.name}_count{self._pairs(labels)} {cumulative}")
+
+
+# --- Metrics recorded by the server ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "vetaris_http_request_duration_seconds", "Time from request line to response, by route",
+    ("route", "method", "status"))
+HTTP_IN_FLIGHT = Gauge("vetaris_http_requests_in_flight", "Requests being handled right now")
+HTTP_REJECTED = Counter("vetaris_http_rejected_total", "Connections answered 503 because the request queue was full")
+DB_QUERY_SECONDS = Histogram(
+    "vetaris_db_query_duration_seconds", "Calls to database.py functions and their duration",
+    ("function",), buckets=DB_BUCKETS)
+BCRYPT_SECONDS = Histogram(
+    "vetaris_bcrypt_duration_seconds", "bcrypt time in the password worker processes",
+    ("op",), buckets=BCRYPT_BUCKETS)
+STATIC_BYTES = Counter("vetaris_static_bytes_sent_total", "Static file body bytes sent", ("encoding",))
+LOG_DROPPED = Counter("vetaris_log_records_dropped_total", "Log records dropped because the log queue was full")
+
+
+# --- Collection ---
+
+def _add(totals, key, cell):
+    total = totals.get(key)
+    if total is None:
+        totals[key] = list(cell)
+    else:
+        for i, value in enumerate(cell):
+            total[i] += value
+
+
+def collect():
+    """This process's values, summed over threads: {(name, labels): cell}.
+
+    Cells are read while their threads keep writing, so a histogram may be
+    one observation ahead in a bucket versus its sum; scrapes tolerate that.
+    """
+    with _shards_lock:
+        shards = list(_shards)
+    totals = {}
+    for shard in shards:
+        for key, cell in shard.copy().items():
+            _add(totals, key, cell)
+    return totals
+
+
+def share(directory):
+    """Publish this process's values in `directory` (one file per pid) so
+    whichever worker answers /metrics can report totals for all of them."""
+    global _dir
+    _dir = directory or None
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # vanished or being replaced
+
+
+def flush():
+    if _dir is None:
+        return
+    values = [[name, list(labels), cell] for (name, labels), cell in collect().items()]
+    _write(os.path.join(_dir, f"{os.getpid()}.json"), {"pid": os.getpid(), "values": values})
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def gather():
+    """Totals over every worker: live values here plus the other workers' snapshots
+    (at most METRICS_FLUSH_INTERVAL old). Gauges only count live processes."""
+    totals = collect()
+    if _dir is None:
+        return totals
+    own = f"{os.getpid()}.json"
+    for name in os.listdir(_dir):
+        if not name.endswith(".json") or name == own:
+            continue
+        data = _read(os.path.join(_dir, name))
+        if not data:
+            continue
+        live = data.get("pid") is not None and _alive(data["pid"])
+        for metric_name, labels, cell in data["values"]:
+            metric = REGISTRY.get(metric_name)
+            if metric is None or (metric.kind == "gauge" and not live):
+                continue
+            _add(totals, (metric_name, tuple(labels)), cell)
+    return totals
+
+
+def archive(directory, pid):
+    """Fold an exited worker's snapshot into archive.json (run by the supervisor),
+    so counters survive restarts without one file per dead pid piling up."""
+    path = os.path.join(directory, f"{pid}.json")
+    data = _read(path)
+    if data is None:
+        return
+    archive_path = os.path.join(directory, "archive.json")
+    totals = {}
+    for metric_name, labels, cell in (_read(archive_path) or {"values": []})["values"] + data["values"]:
+        metric = REGISTRY.get(metric_name)
+        if metric is not None and metric.kind != "gauge":
+            _add(totals, (metric_name, tuple(labels)), cell)
+    values = [[name, list(labels), cell] for (name, labels), cell in totals.items()]
+    _write(archive_path, {"pid": None, "values": values})
+    os.unlink(path)
+
+
+def render():
+    """Prometheus text exposition of gather()."""
+    by_name = {}
+    for (name, labels), cell in gather().items():
+        by_name.setdefault(name, []).append((labels, cell))
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        samples = by_name.get(metric.name)
+        if samples is None and not metric.labelnames and metric.kind != "histogram":
+            samples = [((), [0])]  # unlabelled series exist from the start
+        for labels, cell in sorted(samples or (), key=lambda item: item[0]):
+            metric.render(lines, labels, cell)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class Flusher(threading.Thread):
+    """Writes this worker's snapshot every `interval` seconds."""
+
+    def __init__(self, interval=METRICS_FLUSH_INTERVAL):
+        super().__init__(name="metrics-flusher", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                flush()
+            except Exception as e:
+                log.error("Metrics snapshot failed: %s", e)
+
+    def stop(self):
+        self._stop_event.set()
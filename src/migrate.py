@@ -0,0 +1,139 @@
+import os
+import re
+import hashlib
+import logging
+import psycopg2
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_LOCK_ID = 0x56455441  # pg advisory lock key shared by every process running migrations
+
+log = logging.getLogger("vetaris.migrate")
+
+_FILE_RE = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+
+class Migration:
+    __slots__ = ("version", "name", "path")
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def checksum(self):
+        return hashlib.sha256(self.read().encode("utf-8")).hexdigest()
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Migration files (NNNN_name.sql) in version order."""
+    migrations = []
+    for filename in os.listdir(directory):
+        m = _FILE_RE.match(filename)
+        if m:
+            migrations.append(Migration(int(m.group(1)), m.group(2), os.path.join(directory, filename)))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def current_version(conn):
+    """Highest applied version; 0 for a database that has never been migrated. One query."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        version = cur.fetchone()[0]
+        conn.rollback()  # end the read transaction before the connection goes back to the pool
+        return version
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return 0
+    finally:
+        cur.close()
+
+
+def applied(conn):
+    """{version: checksum} of applied migrations."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT version, checksum FROM schema_version")
+        rows = dict(cur.fetchall())
+        conn.rollback()
+        return rows
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return {}
+    finally:
+        cur.close()
+
+
+def migrate(conn, migrations=None):
+    """Apply pending migrations; returns the list of versions applied.
+
+    The common case (schema already current) costs a single query. Otherwise
+    an advisory lock makes concurrent starters wait for whoever got there
+    first, and each migration commits in its own transaction together with
+    its schema_version row.
+    """
+    migrations = discover() if migrations is None else migrations
+    if not migrations or current_version(conn) >= migrations[-1].version:
+        return []
+
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    done = []
+    try:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+        # Re-read under the lock: another process may have migrated meanwhile
+        version = current_version(conn)
+        for migration in migrations:
+            if migration.version <= version:
+                continue
+            sql = migration.read()
+            try:
+                cur.execute(sql)
+                cur.execute(
+                    "INSERT INTO schema_version (version, name, checksum) VALUES (%s, %s, %s)",
+                    (migration.version, migration.name, hashlib.sha256(sql.encode("utf-8")).hexdigest())
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                log.error("Migration %04d_%s failed", migration.version, migration.name)
+                raise
+            log.info("Applied migration %04d_%s", migration.version, migration.name)
+            done.append(migration.version)
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cur.close()
+    return done
+
+
+def status(conn, migrations=None):
+    """[(migration, state)] with state 'applied', 'pending' or 'changed' (edited after applying)."""
+    migrations = discover() if migrations is None else migrations
+    done = applied(conn)
+    rows = []
+    for migration in migrations:
+        if migration.version not in done:
+            rows.append((migration, "pending"))
+        elif done[migration.version] != migration.checksum():
+            rows.append((migration, "changed"))
+        else:
+            rows.append((migration, "applied"))
+    return rows
@@ -0,0 +1,21 @@
+-- Secondary indexes for the hot query paths in database.py.
+-- check_query_plans.py verifies these are actually used.
+
+-- Order history of one customer, newest first (get_user_orders)
+CREATE INDEX IF NOT EXISTS orders_user_created_idx ON orders (user_id, created_at DESC);
+
+-- Admin order list: keyset pagination on (created_at, id), optionally per status (get_orders_page)
+CREATE INDEX IF NOT EXISTS orders_created_id_idx ON orders (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS orders_status_created_id_idx ON orders (status, created_at DESC, id DESC);
+
+-- Items of a batch of orders (_attach_order_items, inventory.order_lines)
+CREATE INDEX IF NOT EXISTS order_items_order_idx ON order_items (order_id, id);
+
+-- Expired session cleanup
+CREATE INDEX IF NOT EXISTS sessions_expires_idx ON sessions (expires_at);
+
+-- Storefront: active products only
+CREATE INDEX IF NOT EXISTS products_active_idx ON products (id) WHERE is_active;
+
+-- Published posts, newest first
+CREATE INDEX IF NOT EXISTS blog_posts_published_created_idx ON blog_posts (created_at DESC) WHERE is_published;
@@ -0,0 +1,8 @@
+-- Markdown rendered to sanitized HTML on write (see src/markup.py).
+-- *_hash is the source hash the HTML was rendered from; NULL means not rendered yet
+-- (render_markdown.py fills those in).
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_html TEXT;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS description_html TEXT;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS description_hash TEXT;
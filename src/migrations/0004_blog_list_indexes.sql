@@ -0,0 +1,7 @@
+-- Blog listings: keyset pagination on (created_at, id), all posts or only published ones (get_posts_page)
+CREATE INDEX IF NOT EXISTS blog_posts_created_id_idx ON blog_posts (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS blog_posts_published_created_id_idx ON blog_posts (created_at DESC, id DESC)
+    WHERE is_published;
+
+-- The (created_at) index from 0002_hot_path_indexes is covered by the partial index above
+DROP INDEX IF EXISTS blog_posts_published_created_idx;
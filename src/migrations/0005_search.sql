@@ -0,0 +1,70 @@
+-- Full-text search over products and blog posts (database.search).
+--
+-- Each document holds three kinds of lexemes, so a query matches with or without Turkish letters:
+--   * Turkish stems of the original text ('sağlık' for "sağlığı")
+--   * the folded words ('sagligi'), for prefix matches while typing
+--   * the folded stems ('saglik'), for queries typed without Turkish letters
+-- Weights: A = name / title, B = category / summary, C = description / content.
+-- The long fields (C) are stored without positions: they still match, but ts_rank
+-- then costs the same for a long post as for a short one.
+
+-- Keep in sync with textfold.FOLD in Python
+CREATE OR REPLACE FUNCTION vetaris_fold(input text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+AS $$
+    SELECT lower(translate(input, 'ÇĞİIÖŞÜÂÎÛçğıöşüâîû', 'cgiiosuaiucgiosuaiu'))
+$$;
+
+CREATE OR REPLACE FUNCTION vetaris_search_vector(body text, weight "char") RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT setweight(
+        stemmed
+        || to_tsvector('simple', vetaris_fold(coalesce(body, '')))
+        || to_tsvector('simple', array_to_string(ARRAY(SELECT vetaris_fold(lexeme) FROM unnest(stemmed)), ' ')),
+        weight)
+    FROM to_tsvector('turkish', coalesce(body, '')) AS stemmed
+$$;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+-- Recomputed only when the searched columns change: stock updates from orders leave it alone
+CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_vector := vetaris_search_vector(NEW.name, 'A')
+                      || vetaris_search_vector(NEW.category, 'B')
+                      || strip(vetaris_search_vector(NEW.description, 'C'));
+    RETURN NEW;
+END
+$$;
+
+CREATE OR REPLACE TRIGGER products_search_vector
+    BEFORE INSERT OR UPDATE OF name, category, description ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_update();
+
+CREATE OR REPLACE FUNCTION blog_posts_search_vector_update() RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_vector := vetaris_search_vector(NEW.title, 'A')
+                      || vetaris_search_vector(NEW.summary, 'B')
+                      || strip(vetaris_search_vector(NEW.content, 'C'));
+    RETURN NEW;
+END
+$$;
+
+CREATE OR REPLACE TRIGGER blog_posts_search_vector
+    BEFORE INSERT OR UPDATE OF title, summary, content ON blog_posts
+    FOR EACH ROW EXECUTE FUNCTION blog_posts_search_vector_update();
+
+-- Existing rows: a no-op update of a searched column fires the triggers
+UPDATE products SET name = name WHERE search_vector IS NULL;
+UPDATE blog_posts SET title = title WHERE search_vector IS NULL;
+
+-- fastupdate off: new rows go straight into the index instead of a pending list
+-- that every search would have to scan until the next vacuum (writes here are rare)
+CREATE INDEX IF NOT EXISTS products_search_idx ON products USING GIN (search_vector) WITH (fastupdate = off);
+CREATE INDEX IF NOT EXISTS blog_posts_search_idx ON blog_posts USING GIN (search_vector) WITH (fastupdate = off);
@@ -0,0 +1,4 @@
+-- Orders whose stock was taken at checkout (inventory.reserve). Orders placed before
+-- reservation existed never decremented products.stock, so cancelling or
+-- un-cancelling them must not move stock either.
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS stock_reserved BOOLEAN NOT NULL DEFAULT FALSE;
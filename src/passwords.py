@@ -0,0 +1,192 @@
+import os
+import signal
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+import metrics
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))          # work factor for new hashes
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))         # hashing processes per server process
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", str(BCRYPT_WORKERS * 4)))  # running + queued
+
+
+class HashingBusy(Exception):
+    """Too many hash/verify jobs are already pending; the caller should answer 503."""
+
+
+def _exit_with_server(server_pid):
+    # Workers hold both ends of the job pipe, so they never see EOF when the
+    # server is killed outright; poll for it instead. Their parent is the fork
+    # server, which itself waits for its children, so watch the server's pid
+    while True:
+        try:
+            os.kill(server_pid, 0)
+        except OSError:
+            os._exit(0)
+        time.sleep(1.0)
+
+
+def _init_worker(server_pid):
+    # Ctrl+C and reloads are handled by the server, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    threading.Thread(target=_exit_with_server, args=(server_pid,), daemon=True).start()
+
+
+def _hash(password, rounds):
+    started = time.time()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    return hashed, started, time.time() - started
+
+
+def _check(stored_hash, password):
+    started = time.time()
+    try:
+        ok = bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except ValueError:
+        ok = False  # malformed stored hash
+    return ok, started, time.time() - started
+
+
+def hash_cost(stored_hash):
+    """Work factor encoded in a $2b$NN$... hash, or None if it can't be read."""
+    try:
+        return int(stored_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(stored_hash):
+    return hash_cost(stored_hash) != BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    """bcrypt on a small process pool, off the request threads.
+
+    Admission is bounded: once max_pending jobs are running or queued, new
+    calls fail fast with HashingBusy instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers=BCRYPT_WORKERS, max_pending=BCRYPT_MAX_PENDING, rounds=BCRYPT_ROUNDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._rehashes = 0
+        self._timings = {
+            op: {"count": 0, "wait_total": 0.0, "wait_max": 0.0, "time_total": 0.0, "time_max": 0.0}
+            for op in ("hash", "check")
+        }
+
+    def start(self):
+        """Start the worker processes now; otherwise they start on first use.
+
+        Workers come from a forkserver, a fresh process started on first use,
+        so they inherit none of the server's threads, locks or sockets. That
+        makes it safe to (re)start the pool from a request thread.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_init_worker,
+                    initargs=(os.getpid(),),
+                )
+                # Start every worker up front rather than on the first logins
+                for future in [self._executor.submit(time.time) for _ in range(self.workers)]:
+                    future.result()
+        return self
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run(self, op, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HashingBusy("Password hashing queue is full")
+        with self._stats_lock:
+            self._pending += 1
+        submitted = time.time()
+        try:
+            executor = self._executor or self.start()._executor
+            try:
+                result, started, elapsed = executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died (OOM killer etc.); start a fresh pool and retry once
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                result, started, elapsed = self.start()._executor.submit(fn, *args).result()
+        finally:
+            with self._stats_lock:
+                self._pending -= 1
+            self._slots.release()
+
+        waited = max(0.0, started - submitted)
+        metrics.BCRYPT_SECONDS.observe(elapsed, (op,))
+        with self._stats_lock:
+            t = self._timings[op]
+            t["count"] += 1
+            t["wait_total"] += waited
+            t["wait_max"] = max(t["wait_max"], waited)
+            t["time_total"] += elapsed
+            t["time_max"] = max(t["time_max"], elapsed)
+        return result
+
+    def hash(self, password):
+        return self._run("hash", _hash, password, self.rounds)
+
+    def check(self, stored_hash, password):
+        return self._run("check", _check, stored_hash, password)
+
+    def record_rehash(self):
+        with self._stats_lock:
+            self._rehashes += 1
+
+    def stats(self):
+        with self._stats_lock:
+            timings = {}
+            for op, t in self._timings.items():
+                n = t["count"]
+                timings[op] = {
+                    "count": n,
+                    "wait_time_avg": round(t["wait_total"] / n, 6) if n else 0.0,
+                    "wait_time_max": round(t["wait_max"], 6),
+                    "hash_time_avg": round(t["time_total"] / n, 6) if n else 0.0,
+                    "hash_time_max": round(t["time_max"], 6),
+                }
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self._rejected,
+                "rehashes": self._rehashes,
+                **timings,
+            }
+
+
+hasher = PasswordHasher()
+
+
+def hash_password(password):
+    return hasher.hash(password)
+
+
+def check_password(stored_hash, password):
+    return hasher.check(stored_hash, password)
@@ -0,0 +1,281 @@
+import os
+import sys
+import mmap
+import time
+import errno
+import logging
+import shutil
+import signal
+import socket
+import struct
+import tempfile
+import threading
+import subprocess
+
+import metrics
+
+# Environment handed from the supervisor to each worker process
+ENV_SLOT = "VETARIS_WORKER_SLOT"
+ENV_LISTEN_FD = "VETARIS_LISTEN_FD"
+ENV_REUSE_PORT = "VETARIS_REUSE_PORT"
+ENV_STATS_FILE = "VETARIS_WORKER_STATS"
+ENV_METRICS_DIR = "VETARIS_METRICS_DIR"
+
+GRACEFUL_TIMEOUT = float(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))  # seconds to drain on stop/reload
+RESTART_BACKOFF = 1.0  # minimum seconds between restarts of the same slot
+
+log = logging.getLogger("vetaris.supervisor")
+
+_SLOT = struct.Struct("qq")  # pid, requests served
+
+
+class WorkerStats:
+    """Per-worker request counters in a small shared file mapped by every process.
+
+    Each worker only writes its own slot, so the supervisor (and any worker
+    answering /api/admin/stats) can read the whole table without locking.
+    """
+
+    def __init__(self, path, slots, create=False):
+        self.path = path
+        self.slots = slots
+        size = _SLOT.size * slots
+        if create:
+            with open(path, "wb") as f:
+                f.truncate(size)
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._lock = threading.Lock()
+        self.slot = None
+
+    @classmethod
+    def attach(cls):
+        """Open the table in a worker started by the supervisor, else return None."""
+        path = os.environ.get(ENV_STATS_FILE)
+        if not path or ENV_SLOT not in os.environ:
+            return None
+        slots = os.path.getsize(path) // _SLOT.size
+        stats = cls(path, slots)
+        stats.slot = int(os.environ[ENV_SLOT])
+        _, requests = _SLOT.unpack_from(stats._mm, stats.slot * _SLOT.size)
+        _SLOT.pack_into(stats._mm, stats.slot * _SLOT.size, os.getpid(), requests)
+        return stats
+
+    def increment(self):
+        offset = self.slot * _SLOT.size
+        with self._lock:
+            pid, requests = _SLOT.unpack_from(self._mm, offset)
+            _SLOT.pack_into(self._mm, offset, pid, requests + 1)
+
+    def snapshot(self):
+        rows = []
+        for slot in range(self.slots):
+            pid, requests = _SLOT.unpack_from(self._mm, slot * _SLOT.size)
+            rows.append({"slot": slot, "pid": pid, "requests": requests})
+        return rows
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def is_worker():
+    return ENV_SLOT in os.environ
+
+
+def make_worker_server(server_class, address, handler_class):
+    """Build the HTTP server inside a worker, on the socket the supervisor chose."""
+    httpd = server_class(address, handler_class, bind_and_activate=False)
+    if os.environ.get(ENV_LISTEN_FD):
+        # Inherited listening socket: already bound and listening in the supervisor
+        httpd.socket.close()
+        httpd.socket = socket.socket(fileno=int(os.environ[ENV_LISTEN_FD]))
+    else:
+        # SO_REUSEPORT: every worker binds its own socket and the kernel spreads connections
+        httpd.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            httpd.server_bind()
+            httpd.server_activate()
+        except BaseException:
+            httpd.server_close()
+            raise
+    return httpd
+
+
+def run_worker(httpd):
+    """serve_forever() until SIGTERM, then finish in-flight requests and exit."""
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so it can't run on this thread
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    # The supervisor owns reloads and Ctrl+C for the whole process group
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+class Supervisor:
+    """Starts N worker processes on one listening port and keeps them running.
+
+    - crashed workers are restarted (at most once per RESTART_BACKOFF per slot)
+    - SIGHUP starts a fresh generation of workers (picking up new code) and
+      then gracefully stops the old one. `before_reload` runs first (e.g. to
+      apply migrations the new code needs); if it returns False the current
+      workers keep serving
+    - SIGTERM/SIGINT stop all workers, waiting up to GRACEFUL_TIMEOUT
+    - SIGUSR1 prints per-worker request counts
+    """
+
+    def __init__(self, script, address, workers, reuse_port=False, before_reload=None):
+        self.script = os.path.abspath(script)
+        self.address = address
+        self.num_workers = workers
+        self.reuse_port = reuse_port
+        self.before_reload = before_reload
+        self.sock = None
+        self.stats = None
+        self.metrics_dir = None
+        self.workers = {}       # slot -> Popen
+        self.started_at = {}    # slot -> monotonic time of last start
+        self.retiring = []      # Popen objects from a previous generation, draining
+        self._reload = False
+        self._stop = False
+        self._dump = False
+
+    def _spawn(self, slot):
+        env = dict(os.environ)
+        env[ENV_SLOT] = str(slot)
+        env[ENV_STATS_FILE] = self.stats.path
+        env[ENV_METRICS_DIR] = self.metrics_dir
+        pass_fds = ()
+        if self.sock is not None:
+            env[ENV_LISTEN_FD] = str(self.sock.fileno())
+            pass_fds = (self.sock.fileno(),)
+        else:
+            env[ENV_REUSE_PORT] = "1"
+        proc = subprocess.Popen([sys.executable, self.script], env=env, pass_fds=pass_fds)
+        self.workers[slot] = proc
+        self.started_at[slot] = time.monotonic()
+        log.info("Worker %d started (pid %d)", slot, proc.pid, extra={"slot": slot, "worker_pid": proc.pid})
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._reload = True
+        elif signum == signal.SIGUSR1:
+            self._dump = True
+        else:
+            self._stop = True
+
+    def print_stats(self):
+        rows = self.stats.snapshot()
+        total = sum(r["requests"] for r in rows) or 1
+        for r in rows:
+            log.info("Worker %d (pid %d): %d requests (%.1f%%)", r['slot'], r['pid'], r['requests'],
+                     100.0 * r['requests'] / total,
+                     extra={"slot": r['slot'], "worker_pid": r['pid'], "requests": r['requests']})
+
+    def _reload_workers(self):
+        log.info("Reloading workers (SIGHUP)")
+        if self.before_reload is not None and not self.before_reload():
+            log.error("Reload aborted, the current workers keep serving")
+            return
+        old = list(self.workers.values())
+        for slot in range(self.num_workers):
+            self._spawn(slot)
+        for proc in old:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+                self.retiring.append((proc, time.monotonic()))
+
+    def _check_workers(self):
+        for slot, proc in list(self.workers.items()):
+            code = proc.poll()
+            if code is None:
+                continue
+            if time.monotonic() - self.started_at[slot] < RESTART_BACKOFF:
+                continue  # crash loop: wait a bit before trying again
+            log.warning("Worker %d (pid %d) exited with %s, restarting", slot, proc.pid, code,
+                        extra={"slot": slot, "worker_pid": proc.pid, "exit_code": code})
+            self._archive_metrics(proc)
+            self._spawn(slot)
+
+        still_draining = []
+        for proc, since in self.retiring:
+            if proc.poll() is not None:
+                self._archive_metrics(proc)
+                continue
+            if time.monotonic() - since > GRACEFUL_TIMEOUT:
+                proc.kill()
+            still_draining.append((proc, since))
+        self.retiring = still_draining
+
+    def _archive_metrics(self, proc):
+        try:
+            metrics.archive(self.metrics_dir, proc.pid)
+        except Exception as e:
+            log.error("Could not archive metrics of pid %d: %s", proc.pid, e)
+
+    def _shutdown(self):
+        log.info("Stopping workers...")
+        procs = list(self.workers.values()) + [p for p, _ in self.retiring]
+        for proc in procs:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        for proc in procs:
+            try:
+                proc.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    def run(self):
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        fd, stats_path = tempfile.mkstemp(prefix="vetaris-workers-", dir=shm)
+        os.close(fd)
+        self.stats = WorkerStats(stats_path, self.num_workers, create=True)
+        # Each worker snapshots its /metrics values here (see metrics.share)
+        self.metrics_dir = tempfile.mkdtemp(prefix="vetaris-metrics-", dir=shm)
+
+        if not self.reuse_port:
+            self.sock = socket.create_server(self.address, backlog=1024)
+            self.sock.set_inheritable(True)
+
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGUSR1):
+            signal.signal(signum, self._on_signal)
+        # Wake the loop promptly when a worker dies
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        mode = "SO_REUSEPORT" if self.reuse_port else "shared socket"
+        log.info("%d workers on port %d (%s), pid %d", self.num_workers, self.address[1], mode, os.getpid())
+        try:
+            for slot in range(self.num_workers):
+                self._spawn(slot)
+            while not self._stop:
+                if self._reload:
+                    self._reload = False
+                    self._reload_workers()
+                if self._dump:
+                    self._dump = False
+                    self.print_stats()
+                self._check_workers()
+                try:
+                    time.sleep(0.5)
+                except InterruptedError:
+                    pass
+            self._shutdown()
+            self.print_stats()
+        finally:
+            if self.sock is not None:
+                self.sock.close()
+            self.stats.close()
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+            try:
+                os.unlink(stats_path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
@@ -0,0 +1,129 @@
+import os
+import re
+import time
+import logging
+import threading
+import functools
+
+import psycopg2.extensions
+
+from db_pool import PooledConnection
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))                   # statements slower than this are logged
+DB_TRACE_MAX_STATEMENTS = int(os.getenv("DB_TRACE_MAX_STATEMENTS", "50"))        # kept per request (all are counted)
+
+slow_log = logging.getLogger("vetaris.db.slow")
+
+_local = threading.local()
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class RequestTrace:
+    """Statements run by one request: count, total time and the first few in detail."""
+    __slots__ = ("route", "count", "duration", "statements")
+
+    def __init__(self):
+        self.route = None
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []  # (normalized sql, seconds, rows)
+
+    def add(self, sql, duration, rows):
+        self.count += 1
+        self.duration += duration
+        if len(self.statements) < DB_TRACE_MAX_STATEMENTS:
+            self.statements.append((sql, duration, rows))
+
+    def slowest(self, n=5):
+        top = sorted(self.statements, key=lambda s: s[1], reverse=True)[:n]
+        return [{"sql": sql, "ms": round(duration * 1000.0, 2), "rows": rows} for sql, duration, rows in top]
+
+
+def begin():
+    """Start tracing the current thread's request."""
+    trace = _local.trace = RequestTrace()
+    return trace
+
+
+def end():
+    trace, _local.trace = getattr(_local, "trace", None), None
+    return trace
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql):
+    """One-line SQL with literals replaced by '?', so statements group by shape."""
+    return _SPACE_RE.sub(" ", _LITERAL_RE.sub("?", sql)).strip()
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes, list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(params):
+    """Parameter shapes without their values (slow-query log)."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact_value(value) for key, value in params.items()}
+    return [_redact_value(value) for value in params]
+
+
+def _record(cursor, query, params, duration):
+    if not isinstance(query, str):
+        # bytes, or psycopg2.sql.Composed
+        query = query.decode("utf-8", "replace") if isinstance(query, bytes) else query.as_string(cursor)
+    sql = normalize(query)
+    rows = cursor.rowcount
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.add(sql, duration, rows)
+    if duration * 1000.0 >= DB_SLOW_QUERY_MS:
+        slow_log.warning("Slow query", extra={
+            "sql": sql,
+            "duration_ms": round(duration * 1000.0, 2),
+            "rows": rows,
+            "params": redact(params),
+            "route": trace.route if trace is not None else None,
+        })
+
+
+class TracingCursorMixin:
+    """Times every execute() and reports it to the current request's trace."""
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _record(self, query, vars, time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            _record(self, query, None, time.perf_counter() - started)
+
+
+@functools.lru_cache(maxsize=None)
+def traced(cursor_class):
+    return type("Traced" + cursor_class.__name__, (TracingCursorMixin, cursor_class), {})
+
+
+class TracedConnection(PooledConnection):
+    """Pooled connection whose cursors (any cursor_factory) are traced."""
+
+    def cursor(self, name=None, cursor_factory=None, **kwargs):
+        factory = cursor_factory or self.cursor_factory or psycopg2.extensions.cursor
+        return super().cursor(name, cursor_factory=traced(factory), **kwargs)
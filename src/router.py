@@ -0,0 +1,131 @@
+import re
+from urllib.parse import unquote
+
+# <type:name> path parameter converters: (validator, conversion)
+CONVERTERS = {
+    "int": (re.compile(r"\d{1,9}").fullmatch, int),   # fits a Postgres INTEGER
+    "str": (bool, str),                                # any non-empty segment
+}
+
+_PARAM_RE = re.compile(r"^<(?:(\w+):)?(\w+)>$")
+
+
+class Route:
+    __slots__ = ("method", "pattern", "handler", "name", "auth")
+
+    def __init__(self, method, pattern, handler, name, auth):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.name = name
+        self.auth = auth
+
+    def __repr__(self):
+        return f"<Route {self.method} {self.pattern} ({self.name})>"
+
+
+class _Node:
+    __slots__ = ("children", "params", "routes")
+
+    def __init__(self):
+        self.children = {}   # literal segment -> _Node
+        self.params = []     # (validator, conversion, param name, _Node)
+        self.routes = {}     # method -> Route
+
+
+class Router:
+    """Method + path routing with typed parameters.
+
+    Literal paths ("/api/products") sit in a dict and match with one lookup;
+    patterns ("/api/products/<int:product_id>") go into a segment trie, so a
+    lookup costs one step per path segment no matter how many routes exist.
+    Literal segments win over parameters at the same position.
+    """
+
+    def __init__(self):
+        self._static = {}    # path -> {method: Route}
+        self._root = _Node()
+        self.routes = []
+
+    def add(self, method, pattern, handler, name=None, auth=None):
+        route = Route(method.upper(), pattern, handler, name or getattr(handler, "__name__", pattern), auth)
+        segments = pattern.strip("/").split("/")
+        if not any(_PARAM_RE.match(s) for s in segments):
+            table = self._static.setdefault(pattern, {})
+        else:
+            node = self._root
+            for segment in segments:
+                m = _PARAM_RE.match(segment)
+                if not m:
+                    node = node.children.setdefault(segment, _Node())
+                    continue
+                kind, param = m.group(1) or "str", m.group(2)
+                if kind not in CONVERTERS:
+                    raise ValueError(f"Unknown converter '{kind}' in {pattern}")
+                validator, conversion = CONVERTERS[kind]
+                for existing in node.params:
+                    if existing[0] is validator and existing[2] == param:
+                        node = existing[3]
+                        break
+                else:
+                    child = _Node()
+                    node.params.append((validator, conversion, param, child))
+                    node = child
+            table = node.routes
+        if route.method in table:
+            raise ValueError(f"Duplicate route {route.method} {pattern}")
+        table[route.method] = route
+        self.routes.append(route)
+        return route
+
+    def route(self, method, pattern, name=None, auth=None):
+        """Decorator form of add(); returns the function unchanged."""
+        def register(handler):
+            self.add(method, pattern, handler, name=name, auth=auth)
+            return handler
+        return register
+
+    def _walk(self, node, segments, index, method, params, fallback):
+        """Depth-first; returns the first route table holding `method`.
+
+        The first table found for another method is kept in `fallback`
+        (with its params) so the caller can answer 405.
+        """
+        if index == len(segments):
+            if method in node.routes:
+                return node.routes
+            if node.routes and not fallback:
+                fallback.append((node.routes, dict(params)))
+            return None
+        segment = segments[index]
+        child = node.children.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, index + 1, method, params, fallback)
+            if found is not None:
+                return found
+        if node.params:
+            value = unquote(segment)
+            for validator, conversion, name, child in node.params:
+                if validator(value):
+                    params[name] = conversion(value)
+                    found = self._walk(child, segments, index + 1, method, params, fallback)
+                    if found is not None:
+                        return found
+                    del params[name]
+        return None
+
+    def match(self, method, path):
+        """(route, params, allowed methods). route is None if nothing matches
+        (allowed is empty) or only other methods do (answer 405)."""
+        table = self._static.get(path)
+        params = {}
+        if table is None:
+            if not path.startswith("/"):
+                return None, {}, ()
+            fallback = []
+            table = self._walk(self._root, path.strip("/").split("/"), 0, method, params, fallback)
+            if table is None:
+                if not fallback:
+                    return None, {}, ()
+                table, params = fallback[0]
+        return table.get(method), params, tuple(table)
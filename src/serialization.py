@@ -0,0 +1,63 @@
+import os
+import json
+import uuid
+from datetime import datetime, date, time
+from decimal import Decimal
+
+try:
+    import orjson  # optional: C encoder, handles datetime/date/UUID itself
+except ImportError:
+    orjson = None
+
+# JSON_BACKEND=json forces the standard library even when orjson is installed
+BACKEND = "orjson" if orjson is not None and os.getenv("JSON_BACKEND", "orjson") == "orjson" else "json"
+
+# type -> function returning something JSON-native; looked up once per unknown value
+_converters = {}
+
+
+def register(cls, converter):
+    """Teach dumps() a type. Exact type matches are a dict lookup; subclasses fall back to isinstance."""
+    _converters[cls] = converter
+
+
+register(Decimal, float)
+register(datetime, datetime.isoformat)
+register(date, date.isoformat)
+register(time, time.isoformat)
+register(uuid.UUID, str)
+register(set, list)
+register(frozenset, list)
+
+
+def _default(obj):
+    converter = _converters.get(type(obj))
+    if converter is None:
+        for cls, candidate in _converters.items():
+            if isinstance(obj, cls):
+                converter = candidate
+                break
+        else:
+            raise TypeError("Type %s not serializable" % type(obj).__name__)
+    return converter(obj)
+
+
+# Built once: json.dumps() would construct a new encoder on every call with a default hook
+# (ensure_ascii stays on: the C encoder is slower at writing raw non-ASCII text)
+_encoder = json.JSONEncoder(default=_default, separators=(",", ":"))
+
+
+def dumps(data):
+    """Encode `data` as UTF-8 JSON bytes. bytes are assumed to be JSON already and pass through."""
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    if BACKEND == "orjson":
+        # Keys must be str (no OPT_NON_STR_KEYS: it makes every dict slower)
+        return orjson.dumps(data, default=_default)
+    return _encoder.encode(data).encode("utf-8")
+
+
+def loads(body):
+    if BACKEND == "orjson":
+        return orjson.loads(body)
+    return json.loads(body)
@@ -1,31 +1,171 @@
 import http.server
 import socketserver
-import json
 import os
-import mimetypes
+import time
+import logging
+import hmac
 from http import cookies
-from urllib.parse import urlparse, parse_qs, unquote
+from urllib.parse import urlparse, parse_qs
 import database  # Import our database module
-from datetime import datetime, date
+from datetime import date
+from cache import VersionedSnapshot
+import static_files
+import images
+import prefork
+import passwords
+import session_sweeper
+import metrics
+import logs
+import query_trace
+from worker_pool import BoundedThreadPoolMixIn, HTTP_RETRY_AFTER
+from router import Router
+import serialization
 
 PORT = 8801
 DIRECTORY = "public"
 
-# Ensure common MIME types are registered on minimal Linux installs
-mimetypes.add_type('image/jpeg', '.jpg')
-mimetypes.add_type('image/jpeg', '.jpeg')
-mimetypes.add_type('image/png', '.png')
-mimetypes.add_type('image/webp', '.webp')
-mimetypes.add_type('image/gif', '.gif')
-mimetypes.add_type('image/svg+xml', '.svg')
+log = logging.getLogger("vetaris.server")
 
-# Initialize Database
-database.init_db()
+# HTTP/1.1 persistent connections
+KEEPALIVE_TIMEOUT = float(os.getenv("KEEPALIVE_TIMEOUT", "5"))           # idle seconds before closing
+KEEPALIVE_MAX_REQUESTS = int(os.getenv("KEEPALIVE_MAX_REQUESTS", "100"))  # requests per connection
 
-class ThreadingHTTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+# Server-Timing header (DB time and query count) on API responses
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+# Upper bound on catalog staleness when another process changed the products
+CATALOG_CACHE_MAX_AGE = float(os.getenv("CATALOG_CACHE_MAX_AGE", "30"))
+
+def build_catalog():
+    """Serialize the product list and every product once per catalog version."""
+    products = database.load_catalog()
+    return {
+        "list": serialization.dumps([p for p in products if p['is_active']]),
+        "by_id": {p['id']: serialization.dumps(p) for p in products}
+    }
+
+# Rebuilt only after create/update/delete_product bump database.catalog_version()
+catalog_cache = VersionedSnapshot(database.catalog_version, build_catalog, max_age=CATALOG_CACHE_MAX_AGE)
+
+static = static_files.StaticFiles(DIRECTORY)
+image_variants = images.ImageVariants(DIRECTORY)
+
+# Per-worker request counters when running under the pre-fork supervisor (None otherwise).
+# Attached in __main__: the bcrypt fork server imports this module too and must not claim the slot
+worker_stats = None
+# Prefork workers publish their metrics snapshots where the other workers can read them
+metrics.share(os.environ.get(prefork.ENV_METRICS_DIR))
+# Expired-session cleanup thread; started in __main__ (only one prefork worker runs it)
+sweeper = None
+
+# API routes, registered by the @router.route decorators on VetarisHandler
+router = Router()
+
+# Anything else is labelled "other" so clients can't invent new metric series
+METRIC_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'OPTIONS', 'PATCH'))
+
+class PooledHTTPServer(BoundedThreadPoolMixIn, socketserver.TCPServer):
     allow_reuse_address = True
+    request_queue_size = 128  # listen() backlog
+
+    def handle_error(self, request, client_address):
+        log.exception("Unhandled error while serving %s", client_address[0])
 
 class VetarisHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep connections from nginx/apache open between requests; every response
+    # must therefore carry a Content-Length.
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out as separate writes; with Nagle on, the body of
+    # a reused connection waits for the client's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.requests_served = 0
+
+    def handle_one_request(self):
+        self.request_started = None
+        self.trace = None
+        # The stdlib leaves this unset (first request) or stale (keep-alive) when reading the line times out
+        self.raw_requestline = b''
+        try:
+            super().handle_one_request()
+        finally:
+            if self.request_started is not None:
+                self.record_request()
+        if self.raw_requestline:
+            self.requests_served += 1
+            if worker_stats:
+                worker_stats.increment()
+
+    def parse_request(self):
+        # The request line is in: from here on the request counts as in flight
+        self.request_started = time.perf_counter()
+        self.route_name = None
+        self.response_status = None
+        self.user_session = None
+        self.trace = query_trace.begin()
+        metrics.HTTP_IN_FLIGHT.inc()
+        return super().parse_request()
+
+    def record_request(self):
+        """Metrics and the (sampled) access log line for the request just handled."""
+        duration = time.perf_counter() - self.request_started
+        trace = query_trace.end()
+        route = self.route_name or 'unmatched'
+        method = self.command if self.command in METRIC_METHODS else 'other'
+        metrics.HTTP_IN_FLIGHT.dec()
+        metrics.HTTP_REQUEST_SECONDS.observe(duration, (route, method, str(self.response_status)))
+        # path and headers are missing when the request line itself was rejected
+        headers = getattr(self, 'headers', None)
+        fields = {}
+        if trace.count and duration * 1000.0 >= logs.LOG_SLOW_REQUEST_MS:
+            fields['statements'] = trace.slowest()
+        logs.log_access(
+            self.response_status, duration,
+            route=route,
+            method=method,
+            path=getattr(self, 'path', '').split('?', 1)[0][:200],
+            user_id=self.user_session['user_id'] if self.user_session else None,
+            queries=trace.count,
+            db_ms=round(trace.duration * 1000.0, 2),
+            client=(headers and headers.get('X-Real-IP')) or self.client_address[0],
+            **fields
+        )
+
+    def send_response_only(self, code, message=None):
+        self.response_status = code
+        super().send_response_only(code, message)
+
+    def end_headers(self):
+        trace = getattr(self, 'trace', None)
+        if SERVER_TIMING and trace is not None and self.route_name not in (None, 'static'):
+            self.send_header('Server-Timing', 'db;dur=%.1f;desc="%d queries", app;dur=%.1f' % (
+                trace.duration * 1000.0, trace.count, (time.perf_counter() - self.request_started) * 1000.0))
+        if not self.close_connection and self.requests_served + 1 >= KEEPALIVE_MAX_REQUESTS:
+            self.send_header('Connection', 'close')  # also sets close_connection
+        super().end_headers()
+
+    def log_request(self, code='-', size='-'):
+        pass  # record_request() writes the access log once the response is complete
+
+    def log_error(self, format, *args):
+        # An idle keep-alive connection hitting the timeout is normal, not an error
+        if self.requests_served and format.startswith("Request timed out"):
+            return
+        # send_error() statuses already show up in the access log
+        if format.startswith("code "):
+            return
+        log.warning(format, *args, extra={"client": self.client_address[0]})
+
+    def read_body(self):
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = 0
+        return self.rfile.read(content_length) if content_length > 0 else b''
+
     def parse_cookies(self):
         if 'Cookie' in self.headers:
             return cookies.SimpleCookie(self.headers['Cookie'])
@@ -38,393 +178,552 @@ class VetarisHandler(http.server.SimpleHTTPRequestHandler):
             return database.get_session(session_id)
         return None
 
-    def send_json_response(self, data, status=200):
+    def send_json_response(self, data, status=200, headers=None):
+        """Serialize and send `data`; bytes are taken as encoded JSON and sent as-is."""
+        self.send_json_bytes(serialization.dumps(data), status, headers)
+
+    def send_busy(self):
+        """503 for work shed under load; the client may retry shortly."""
+        self.send_json_response({"error": "Server busy, please retry"}, 503,
+                                headers={'Retry-After': str(HTTP_RETRY_AFTER)})
+
+    def send_json_bytes(self, body, status=200, headers=None):
+        """Send an already-serialized JSON body."""
         self.send_response(status)
-        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        
-        # Helper to serialize datetime and decimal objects
-        from decimal import Decimal
-        def json_serial(obj):
-            if isinstance(obj, (datetime, date)):
-                return obj.isoformat()
-            if isinstance(obj, Decimal):
-                return float(obj)
-            raise TypeError ("Type %s not serializable" % type(obj))
-
-        self.wfile.write(json.dumps(data, default=json_serial).encode('utf-8'))
+        self.wfile.write(body)
+
+    def query_param(self, name):
+        """First value of a query string parameter, stripped; None if missing or blank."""
+        values = self.query_params.get(name)
+        return values[0].strip() if values and values[0].strip() else None
 
     def check_admin(self):
-        user_session = self.get_current_user()
-        if user_session and user_session.get('is_admin'):
+        self.user_session = self.get_current_user()
+        if self.user_session and self.user_session.get('is_admin'):
             return True
         return False
 
-    def do_POST(self):
+    def dispatch(self, method):
+        """Route the request; unmatched GETs outside /api/ are static files."""
         parsed = urlparse(self.path)
         clean_path = parsed.path
-
-        # Admin Upload Endpoint (Multipart) - Quick & Dirty handling
-        if clean_path == '/api/upload':
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
-            
-            # This is a basic implementation. For production, use `cgi` or `multipart` parser
-            # But simplehttp server doesn't parse multipart automatically.
-            # We'll skip complex upload for now or assume a simpler base64 json mechanism if possible,
-            # Or just save files to distinct path if we really want multipart.
-            # Let's switch to JSON base64 for simplicity in this "no-framework" environment.
-            pass 
-
-        # Parse JSON content length
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-        except ValueError:
-            content_length = 0
-            
-        post_data = self.rfile.read(content_length)
-        
-        try:
-            if content_length > 0:
-                data = json.loads(post_data.decode('utf-8'))
+        self.query_params = parse_qs(parsed.query)
+        self.json_body = None
+        # Always consume the body, so the connection can be reused
+        body = self.read_body() if method != 'GET' else b''
+
+        route, params, allowed = router.match(method, clean_path)
+        self.route_name = self.trace.route = route.name if route else None
+        if route is None:
+            if method == 'GET' and not clean_path.startswith('/api/'):
+                self.route_name = 'static'
+                self.serve_static(clean_path, query_params=self.query_params)
+            elif allowed:
+                self.send_json_response({"error": "Method not allowed"}, 405,
+                                        headers={'Allow': ', '.join(allowed)})
             else:
-                data = {}
-        except json.JSONDecodeError:
-            self.send_json_response({"error": "Invalid JSON"}, 400)
+                self.send_error(404, "Endpoint not found")
             return
 
-        # Auth Endpoints
-        if clean_path == '/api/auth/register':
-            email = data.get('email')
-            password = data.get('password')
-
-            if not email or not password:
-                self.send_json_response({"error": "Email and password required"}, 400)
+        if route.auth == 'admin' and not self.check_admin():
+            self.send_json_response({"error": "Unauthorized"}, 403)
+            return
+        if route.auth == 'user':
+            self.user_session = self.get_current_user()
+            if not self.user_session:
+                self.send_json_response({"error": "Unauthorized"}, 401)
                 return
 
+        if method in ('POST', 'PUT'):
             try:
-                user = database.create_user(email, password)
-                if user:
-                    self.send_json_response({"message": "User created successfully", "user_id": user[0]})
-                else:
-                    self.send_json_response({"error": "Unknown error"}, 500)
-            except ValueError as e:
-                # User already exists
-                self.send_json_response({"error": str(e)}, 409)
-            except Exception as e:
-                # Database error
-                self.send_json_response({"error": str(e)}, 500)
-            return
+                self.json_body = serialization.loads(body) if body else {}
+            except (ValueError, UnicodeDecodeError):
+                self.json_body = None
+            if not isinstance(self.json_body, dict):
+                self.send_json_response({"error": "Invalid JSON"}, 400)
+                return
 
-        elif clean_path == '/api/auth/login':
-            email = data.get('email')
-            password = data.get('password')
-
-            user = database.get_user_by_email(email)
-            if user and database.verify_password(user['password_hash'], password):
-                session_id = database.create_session(user['id'])
-
-                # Set Cookie
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-
-                # HttpOnly cookie for security
-                cookie = cookies.SimpleCookie()
-                cookie['session_id'] = session_id
-                cookie['session_id']['path'] = '/'
-                cookie['session_id']['httponly'] = True
-                self.send_header('Set-Cookie', cookie.output(header=''))
-
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    "message": "Login successful",
-                    "email": user['email'],
-                    "is_admin": user.get('is_admin', False)
-                }).encode('utf-8'))
-            else:
-                self.send_json_response({"error": "Invalid credentials"}, 401)
-            return
+        route.handler(self, **params)
 
-        elif clean_path == '/api/orders':
-            user_session = self.get_current_user()
-            if not user_session:
-                self.send_json_response({"error": "Unauthorized"}, 401)
-                return
+    def do_GET(self):
+        self.dispatch('GET')
 
-            items = data.get('items')
-            total = data.get('total')
+    def do_POST(self):
+        self.dispatch('POST')
 
-            if not items or not total:
-                 self.send_json_response({"error": "Items and total required"}, 400)
-                 return
+    def do_PUT(self):
+        self.dispatch('PUT')
 
-            try:
-                order_id = database.create_order(user_session['user_id'], items, total)
-                self.send_json_response({"message": "Order created successfully", "order_id": order_id})
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def do_HEAD(self):
+        clean_path = urlparse(self.path).path
+        if clean_path.startswith('/api/'):
+            self.send_error(405, "Method not allowed")
             return
+        self.route_name = 'static'
+        self.serve_static(clean_path, head_only=True, query_params=parse_qs(urlparse(self.path).query))
 
-        elif clean_path == '/api/auth/logout':
-            cookie = self.parse_cookies()
-            if 'session_id' in cookie:
-                database.delete_session(cookie['session_id'].value)
+    # --- Auth Endpoints ---
 
-            # Clear cookie
-            self.send_response(200)
-            cookie = cookies.SimpleCookie()
-            cookie['session_id'] = ''
-            cookie['session_id']['path'] = '/'
-            cookie['session_id']['expires'] = 0
-            self.send_header('Set-Cookie', cookie.output(header=''))
-            self.end_headers()
-            self.wfile.write(json.dumps({"message": "Logged out"}).encode('utf-8'))
-            return
+    @router.route('POST', '/api/auth/register', name='auth.register')
+    def register(self):
+        data = self.json_body
+        email = data.get('email')
+        password = data.get('password')
 
-        # --- Admin Endpoints ---
+        if not email or not password:
+            self.send_json_response({"error": "Email and password required"}, 400)
+            return
 
-        elif clean_path == '/api/products': # Create Product
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
-            try:
-                product = database.create_product(data)
-                self.send_json_response(product, 201)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
+        try:
+            user = database.create_user(email, password)
+            if user:
+                self.send_json_response({"message": "User created successfully", "user_id": user[0]})
+            else:
+                self.send_json_response({"error": "Unknown error"}, 500)
+        except ValueError as e:
+            # User already exists
+            self.send_json_response({"error": str(e)}, 409)
+        except passwords.HashingBusy:
+            self.send_busy()
+        except Exception as e:
+            # Database error
+            self.send_json_response({"error": str(e)}, 500)
+
+    @router.route('POST', '/api/auth/login', name='auth.login')
+    def login(self):
+        data = self.json_body
+        email = data.get('email')
+        password = data.get('password')
+
+        user = database.get_user_by_email(email) if email and password else None
+        try:
+            valid = bool(user) and database.verify_password(user['password_hash'], password)
+        except passwords.HashingBusy:
+            self.send_busy()
             return
+        if valid:
+            if passwords.needs_rehash(user['password_hash']):
+                # BCRYPT_ROUNDS changed since this hash was made; upgrade it while we have the password
+                try:
+                    if database.update_password_hash(user['id'], passwords.hash_password(password)):
+                        passwords.hasher.record_rehash()
+                except passwords.HashingBusy:
+                    pass  # try again on the next login
+            session_id = database.create_session(user['id'])
+
+            # HttpOnly cookie for security
+            cookie = cookies.SimpleCookie()
+            cookie['session_id'] = session_id
+            cookie['session_id']['path'] = '/'
+            cookie['session_id']['httponly'] = True
 
-        elif clean_path.startswith('/api/admin/orders/'):
-            # e.g. /api/admin/orders/5/status
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
+            self.send_json_response({
+                "message": "Login successful",
+                "email": user['email'],
+                "is_admin": user.get('is_admin', False)
+            }, headers={'Set-Cookie': cookie.output(header='').strip()})
+        else:
+            self.send_json_response({"error": "Invalid credentials"}, 401)
 
-            parts = clean_path.split('/')
-            if len(parts) >= 6 and parts[5] == 'status':
-                order_id = parts[4]
-                status = data.get('status')
-                if database.update_order_status(order_id, status):
-                    self.send_json_response({"success": True})
-                else:
-                     self.send_json_response({"error": "Update failed"}, 500)
-            return
+    @router.route('POST', '/api/auth/logout', name='auth.logout')
+    def logout(self):
+        cookie = self.parse_cookies()
+        if 'session_id' in cookie:
+            database.delete_session(cookie['session_id'].value)
+
+        # Clear cookie
+        cookie = cookies.SimpleCookie()
+        cookie['session_id'] = ''
+        cookie['session_id']['path'] = '/'
+        cookie['session_id']['expires'] = 0
+        self.send_json_response({"message": "Logged out"},
+                                headers={'Set-Cookie': cookie.output(header='').strip()})
+
+    @router.route('GET', '/api/auth/me', name='auth.me')
+    def me(self):
+        user_session = self.get_current_user()
+        if user_session:
+            self.send_json_response({
+                "authenticated": True,
+                "email": user_session['email'],
+                "is_admin": user_session.get('is_admin', False)
+            })
+        else:
+            self.send_json_response({"authenticated": False}, 401)
 
-        elif clean_path == '/api/posts': # Create Blog Post
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
-            try:
-                post = database.create_post(data)
-                self.send_json_response(post, 201)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
-            return
-            
-        self.send_error(404, "Endpoint not found")
+    # --- Products ---
 
-    def do_PUT(self):
-        parsed = urlparse(self.path)
-        clean_path = parsed.path
+    @router.route('GET', '/api/products', name='products.list')
+    def list_products(self):
+        try:
+            self.send_json_bytes(catalog_cache.get()["list"])
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
 
-        # Parse content length
+    @router.route('GET', '/api/products/<int:product_id>', name='products.detail')
+    def get_product(self, product_id):
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            body = catalog_cache.get()["by_id"].get(product_id)
+            if body:
+                self.send_json_bytes(body)
             else:
-                data = {}
-        except:
-             self.send_json_response({"error": "Invalid request"}, 400)
-             return
+                self.send_json_response({"error": "Product not found"}, 404)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
 
-        if clean_path.startswith('/api/products/'):
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
+    @router.route('POST', '/api/products', name='products.create', auth='admin')
+    def create_product(self):
+        try:
+            product = database.create_product(self.json_body)
+            self.send_json_response(product, 201)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
 
-            product_id = clean_path.split('/')[-1]
-            try:
-                updated = database.update_product(product_id, data)
-                if updated:
-                    self.send_json_response(updated)
-                else:
-                    self.send_json_response({"error": "Product not found"}, 404)
-            except Exception as e:
-                 self.send_json_response({"error": str(e)}, 500)
-            return
+    @router.route('PUT', '/api/products/<int:product_id>', name='products.update', auth='admin')
+    def update_product(self, product_id):
+        try:
+            updated = database.update_product(product_id, self.json_body)
+            if updated:
+                self.send_json_response(updated)
+            else:
+                self.send_json_response({"error": "Product not found"}, 404)
+        except database.StockChanged as e:
+            self.send_json_response({"error": str(e), "stock": e.current}, 409)
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, 400)
+        except Exception as e:
+             self.send_json_response({"error": str(e)}, 500)
+
+    @router.route('DELETE', '/api/products/<int:product_id>', name='products.delete', auth='admin')
+    def delete_product(self, product_id):
+        try:
+            database.delete_product(product_id)
+            self.send_json_response({"success": True})
+        except Exception as e:
+             self.send_json_response({"error": str(e)}, 500)
 
-        elif clean_path.startswith('/api/posts/'):
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
+    # --- Orders ---
 
-            post_id = clean_path.split('/')[-1]
-            try:
-                updated = database.update_post(post_id, data)
-                if updated:
-                    self.send_json_response(updated)
-                else:
-                    self.send_json_response({"error": "Post not found"}, 404)
-            except Exception as e:
-                 self.send_json_response({"error": str(e)}, 500)
-            return
+    @router.route('GET', '/api/orders', name='orders.list', auth='user')
+    def list_orders(self):
+        orders = database.get_user_orders(self.user_session['user_id'])
+        self.send_json_response(orders)
 
-    def do_DELETE(self):
-        parsed = urlparse(self.path)
-        clean_path = parsed.path
+    @router.route('POST', '/api/orders', name='orders.create', auth='user')
+    def create_order(self):
+        items = self.json_body.get('items')
 
-        if clean_path.startswith('/api/products/'):
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
+        if not items:
+             self.send_json_response({"error": "Items required"}, 400)
+             return
 
-            product_id = clean_path.split('/')[-1]
-            try:
-                database.delete_product(product_id)
-                self.send_json_response({"success": True})
-            except Exception as e:
-                 self.send_json_response({"error": str(e)}, 500)
+        # Prices and the total come from the products table, not the client
+        try:
+            order_id = database.create_order(self.user_session['user_id'], items)
+            self.send_json_response({"message": "Order created successfully", "order_id": order_id})
+        except database.InvalidOrder as e:
+            self.send_json_response({"error": str(e), "items": e.problems}, 400)
+        except database.InsufficientStock as e:
+            self.send_json_response({"error": str(e), "items": e.shortfalls}, 409)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
+
+    @router.route('GET', '/api/admin/orders', name='admin.orders', auth='admin')
+    def admin_orders(self):
+        try:
+            page = database.get_orders_page(
+                limit=int(self.query_param('limit') or 50),
+                cursor=self.query_param('cursor'),
+                status=self.query_param('status'),
+                date_from=date.fromisoformat(self.query_param('from')) if self.query_param('from') else None,
+                date_to=date.fromisoformat(self.query_param('to')) if self.query_param('to') else None,
+                email=self.query_param('email'),
+                with_total=self.query_param('total') != '0'
+            )
+            self.send_json_response(page)
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, 400)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
+
+    @router.route('POST', '/api/admin/orders/<int:order_id>/status', name='admin.order_status', auth='admin')
+    def update_order_status(self, order_id):
+        status = self.json_body.get('status')
+        try:
+            updated = database.update_order_status(order_id, status)
+        except database.InsufficientStock as e:
+            self.send_json_response({"error": str(e), "items": e.shortfalls}, 409)
             return
+        if updated:
+            self.send_json_response({"success": True})
+        else:
+             self.send_json_response({"error": "Update failed"}, 500)
 
-        elif clean_path.startswith('/api/posts/'):
-            if not self.check_admin():
-                self.send_json_response({"error": "Unauthorized"}, 403)
-                return
-
-            post_id = clean_path.split('/')[-1]
-            try:
-                database.delete_post(post_id)
-                self.send_json_response({"success": True})
-            except Exception as e:
-                 self.send_json_response({"error": str(e)}, 500)
-            return
+    # --- Blog ---
 
-    def do_GET(self):
-        parsed = urlparse(self.path)
-        clean_path = parsed.path
-        query_params = parse_qs(parsed.query)
-
-        # API Endpoints
-        if clean_path == '/api/products':
-            try:
-                products = database.get_all_products()
-                self.send_json_response(products)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
-            return
+    def send_posts_page(self, public_only):
+        """?limit=&cursor=&fields=a,b,c -> {"posts", "next_cursor"} (see database.get_posts_page)"""
+        fields = self.query_param('fields')
+        try:
+            page = database.get_posts_page(
+                limit=int(self.query_param('limit') or 12),
+                cursor=self.query_param('cursor'),
+                public_only=public_only,
+                fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+            )
+            self.send_json_response(page)
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, 400)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
+
+    @router.route('GET', '/api/posts', name='posts.list')
+    def list_posts(self):
+        self.send_posts_page(public_only=True)
+
+    # Any segment: get_post takes ids and slugs, and slugs stored before
+    # textfold.slugify may hold punctuation
+    @router.route('GET', '/api/posts/<str:post_id>', name='posts.detail')
+    def get_post(self, post_id):
+        # Single Post by ID or Slug
+        try:
+            post = database.get_post(post_id)
+            if post:
+                 self.send_json_response(post)
+            else:
+                 self.send_json_response({"error": "Post not found"}, 404)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
 
-        elif clean_path.startswith('/api/products/'):
-            product_id = clean_path.split('/')[-1]
-            try:
-                product = database.get_product(product_id)
-                if product:
-                    self.send_json_response(product)
-                else:
-                    self.send_json_response({"error": "Product not found"}, 404)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
-            return
+    @router.route('POST', '/api/posts', name='posts.create', auth='admin')
+    def create_post(self):
+        try:
+            post = database.create_post(self.json_body)
+            self.send_json_response(post, 201)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
 
-        elif clean_path == '/api/auth/me':
-            user_session = self.get_current_user()
-            if user_session:
-                self.send_json_response({
-                    "authenticated": True,
-                    "email": user_session['email'],
-                    "is_admin": user_session.get('is_admin', False)
-                })
+    @router.route('PUT', '/api/posts/<int:post_id>', name='posts.update', auth='admin')
+    def update_post(self, post_id):
+        try:
+            updated = database.update_post(post_id, self.json_body)
+            if updated:
+                self.send_json_response(updated)
             else:
-                self.send_json_response({"authenticated": False}, 401)
-            return
+                self.send_json_response({"error": "Post not found"}, 404)
+        except Exception as e:
+             self.send_json_response({"error": str(e)}, 500)
 
-        elif clean_path == '/api/orders':
-            user_session = self.get_current_user()
-            if not user_session:
+    @router.route('DELETE', '/api/posts/<int:post_id>', name='posts.delete', auth='admin')
+    def delete_post(self, post_id):
+        try:
+            database.delete_post(post_id)
+            self.send_json_response({"success": True})
+        except Exception as e:
+             self.send_json_response({"error": str(e)}, 500)
+
+    # Admin Blog List (All posts)
+    @router.route('GET', '/api/admin/posts', name='admin.posts', auth='admin')
+    def admin_posts(self):
+        self.send_posts_page(public_only=False)
+
+    # --- Search ---
+
+    @router.route('GET', '/api/search', name='search')
+    def search(self):
+        """?q=words&type=products,posts&limit=10&prefix=1 -> {"query", "products", "posts"}"""
+        kinds = self.query_param('type')
+        try:
+            results = database.search(
+                self.query_param('q') or '',
+                kinds=[k.strip() for k in kinds.split(',') if k.strip()] if kinds else ("products", "posts"),
+                limit=int(self.query_param('limit') or 10),
+                prefix=self.query_param('prefix') == '1'
+            )
+            self.send_json_response({"query": self.query_param('q') or '', **results})
+        except ValueError as e:
+            self.send_json_response({"error": str(e)}, 400)
+        except Exception as e:
+            self.send_json_response({"error": str(e)}, 500)
+
+    # Admin Runtime Stats (pool sizing etc.)
+    @router.route('GET', '/api/admin/stats', name='admin.stats', auth='admin')
+    def admin_stats(self):
+        self.send_json_response({
+            "http": self.server.pool_stats(),
+            "db_pool": database.pool_stats(),
+            "session_cache": database.session_cache.stats(),
+            "session_listener": bool(database.session_listener and database.session_listener.connected.is_set()),
+            "catalog_cache": catalog_cache.stats(),
+            "static": static.stats(),
+            "passwords": passwords.hasher.stats(),
+            "session_sweeper": sweeper.stats() if sweeper else None,
+            "workers": worker_stats.snapshot() if worker_stats else None
+        })
+
+    # Prometheus scrape target; summed over all prefork workers
+    @router.route('GET', '/metrics', name='metrics')
+    def prometheus_metrics(self):
+        if metrics.METRICS_TOKEN:
+            expected = 'Bearer ' + metrics.METRICS_TOKEN
+            if not hmac.compare_digest(self.headers.get('Authorization', ''), expected):
                 self.send_json_response({"error": "Unauthorized"}, 401)
                 return
-
-            orders = database.get_user_orders(user_session['user_id'])
-            self.send_json_response(orders)
+        body = metrics.render()
+        self.send_response(200)
+        self.send_header('Content-type', metrics.CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_static(self, clean_path, head_only=False, query_params=None):
+        vary_accept = False
+        width = (query_params or {}).get('w', [''])[0]
+        if width.isdigit() and clean_path.startswith('/images/'):
+            # Responsive image: /images/x.png?w=640 -> best derivative for the Accept header
+            variant_path = image_variants.pick(clean_path, int(width), self.headers.get('Accept'))
+            if variant_path:
+                clean_path = variant_path
+                vary_accept = True
+
+        info = static.lookup(clean_path)
+        if not info:
+            self.send_error(404, "File not found")
             return
-
-        elif clean_path == '/api/admin/orders':
-            if not self.check_admin():
-                 self.send_json_response({"error": "Unauthorized"}, 403)
-                 return
-            orders = database.get_all_orders()
-            self.send_json_response(orders)
+        if vary_accept:
+            # The derivative behind this URL changes when the source does
+            info = info.copy()
+            info.cache_control = 'public, max-age=%d' % static_files.STATIC_MAX_AGE
+        info = static.negotiate(clean_path, info, self.headers.get('Accept-Encoding'))
+
+        if static_files.is_not_modified(self.headers, info):
+            self.send_response(304)
+            self.send_header('ETag', info.etag)
+            self.send_header('Last-Modified', info.last_modified)
+            self.send_header('Cache-Control', info.cache_control)
+            self.send_vary(info, vary_accept)
+            self.end_headers()
             return
 
-        # Blog Public Endpoints
-        elif clean_path == '/api/posts':
-            try:
-                posts = database.get_all_posts(public_only=True)
-                self.send_json_response(posts)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
+        byte_range = static_files.parse_range(self.headers, info)
+        if byte_range is False:
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */%d' % info.size)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
             return
 
-        elif clean_path.startswith('/api/posts/'):
-            # Single Post by ID or Slug
-            post_id = clean_path.split('/')[-1]
-            try:
-                post = database.get_post(post_id)
-                if post:
-                     self.send_json_response(post)
-                else:
-                     self.send_json_response({"error": "Post not found"}, 404)
-            except Exception as e:
-                self.send_json_response({"error": str(e)}, 500)
-            return
+        if byte_range:
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, end, info.size))
+        else:
+            start, end = 0, info.size - 1
+            self.send_response(200)
+        length = end - start + 1
+
+        self.send_header('Content-type', info.content_type)
+        self.send_header('Content-Length', str(length))
+        self.send_header('ETag', info.etag)
+        self.send_header('Last-Modified', info.last_modified)
+        self.send_header('Cache-Control', info.cache_control)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_vary(info, vary_accept)
+        if info.encoding:
+            self.send_header('Content-Encoding', info.encoding)
+        self.end_headers()
 
-        # Admin Blog List (All posts)
-        elif clean_path == '/api/admin/posts':
-            if not self.check_admin():
-                 self.send_json_response({"error": "Unauthorized"}, 403)
-                 return
-            posts = database.get_all_posts(public_only=False)
-            self.send_json_response(posts)
+        if head_only:
             return
-
-        # Serve Static Files
-        file_path_str = clean_path if clean_path != '/' else '/index.html'
-        file_path_str = unquote(file_path_str)  # %C3%9C → Ü gibi Türkçe karakter çözümlemesi
-
-        # Construct full path to the file in 'public' directory
-        file_path = os.path.join(DIRECTORY, file_path_str.lstrip('/'))
-
-        # Check if file exists
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            mime_type, _ = mimetypes.guess_type(file_path)
-            self.send_response(200)
-            if mime_type:
-                self.send_header('Content-type', mime_type)
-            self.end_headers()
-            with open(file_path, 'rb') as f:
-                self.wfile.write(f.read())
-        else:
-            self.send_error(404, "File not found")
+        try:
+            static_files.send_body(self.connection, self.wfile, info, start, length)
+            metrics.STATIC_BYTES.inc(length, (info.encoding or 'identity',))
+        except FileNotFoundError:
+            # Deleted between stat() and open(); headers are already out, so just drop the connection
+            self.close_connection = True
+
+    def send_vary(self, info, vary_accept=False):
+        vary = []
+        if info.compressible:
+            vary.append('Accept-Encoding')
+        if vary_accept:
+            vary.append('Accept')
+        if vary:
+            self.send_header('Vary', ', '.join(vary))
 
     def log_message(self, format, *args):
-        # Override to log to console
-        print(f"[{self.log_date_time_string()}] {format%args}")
+        log.info(format, *args)
 
 if __name__ == "__main__":
-    # Force unbuffered output for Docker/Systemd logs
     import sys
-    sys.stdout.reconfigure(line_buffering=True)
+    import argparse
+    # JSON lines on stdout (journald), written by one background thread; see logs.py
+    logs.setup()
+
+    if prefork.is_worker():
+        # Started by the supervisor below
+        worker_stats = prefork.WorkerStats.attach()
+        passwords.hasher.start()
+        database.start_session_listener()
+        if session_sweeper.SESSION_SWEEP_ENABLED and worker_stats.slot == 0:
+            sweeper = session_sweeper.SessionSweeper()
+            sweeper.start()
+        metrics.Flusher().start()
+        httpd = prefork.make_worker_server(PooledHTTPServer, ("", PORT), VetarisHandler)
+        log.info("Worker %d ready (pid %d)", worker_stats.slot, os.getpid())
+        prefork.run_worker(httpd)
+        # Last snapshot, so the supervisor can keep this worker's counters
+        metrics.flush()
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Vetaris web server")
+    parser.add_argument('--workers', type=int, nargs='?', const=0, default=None,
+                        help="pre-fork N worker processes (default: CPU count)")
+    parser.add_argument('--reuse-port', action='store_true',
+                        help="let each worker bind its own SO_REUSEPORT socket instead of sharing one")
+    args = parser.parse_args()
     
-    print(f"✅ SYSTEM: Vetaris Server baslatiliyor... Port: {PORT}")
-    print(f"Statik dosya dizini: {DIRECTORY}")
+    log.info("Vetaris server starting on port %d, static files from %s", PORT, DIRECTORY)
+
+    # Migrations run once here; prefork workers skip straight to serving
+    database.init_db()
+
+    if args.workers is not None:
+        # The supervisor doesn't query the database after this; workers open their own pools
+        database.close_pool()
+
+        def migrate_before_reload():
+            # Code shipped with a SIGHUP reload may bring migrations (read from disk,
+            # so this older process applies them too); its workers need them first
+            applied = database.init_db()
+            database.close_pool()
+            return applied
+
+        workers = args.workers or os.cpu_count() or 1
+        prefork.Supervisor(__file__, ("", PORT), workers, reuse_port=args.reuse_port,
+                           before_reload=migrate_before_reload).run()
+        sys.exit(0)
     
-    # Use ThreadingTCPServer for concurrent requests
-    with ThreadingHTTPServer(("", PORT), VetarisHandler) as httpd:
-        print("Sunucu calisiyor. Durdurmak icin CTRL+C basin.")
+    passwords.hasher.start()
+    database.start_session_listener()
+    if session_sweeper.SESSION_SWEEP_ENABLED:
+        sweeper = session_sweeper.SessionSweeper()
+        sweeper.start()
+
+    # Fixed-size thread pool with a bounded queue (HTTP_THREADS / HTTP_QUEUE_SIZE)
+    with PooledHTTPServer(("", PORT), VetarisHandler) as httpd:
+        log.info("Server running, press CTRL+C to stop")
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
-            print("\nSunucu durduruluyor...")
+            log.info("Server stopping...")
             httpd.server_close()
@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+import time
+
+import database
+
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "300"))  # seconds between runs
+SESSION_SWEEP_BATCH = int(os.getenv("SESSION_SWEEP_BATCH", "1000"))        # rows deleted per statement
+SESSION_SWEEP_PAUSE = float(os.getenv("SESSION_SWEEP_PAUSE", "0.1"))       # seconds between batches
+SESSION_SWEEP_ENABLED = os.getenv("SESSION_SWEEP_ENABLED", "1") == "1"
+
+log = logging.getLogger("vetaris.sweeper")
+
+
+def sweep_batch(batch_size=SESSION_SWEEP_BATCH):
+    """Delete up to `batch_size` expired sessions in one short transaction.
+
+    SKIP LOCKED lets two sweepers (e.g. old and new worker during a reload)
+    run side by side without waiting on each other; the ARRAY() form keeps
+    the delete itself on the primary key instead of a hash join over the table.
+    """
+    with database.db_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            DELETE FROM sessions
+            WHERE session_id = ANY(ARRAY(
+                SELECT session_id FROM sessions
+                WHERE expires_at < CURRENT_TIMESTAMP
+                ORDER BY expires_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ))
+            RETURNING session_id
+        """, (batch_size,))
+        purged = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        cur.close()
+    for session_id in purged:
+        database.session_cache.invalidate(session_id)
+    return len(purged)
+
+
+def sweep(batch_size=SESSION_SWEEP_BATCH, pause=SESSION_SWEEP_PAUSE, stop_event=None):
+    """Delete every expired session, batch by batch. Returns (rows, batches)."""
+    total = batches = 0
+    while True:
+        purged = sweep_batch(batch_size)
+        total += purged
+        batches += 1
+        if purged < batch_size:
+            return total, batches
+        # Give other transactions room between batches
+        if stop_event is not None:
+            if stop_event.wait(pause):
+                return total, batches
+        else:
+            time.sleep(pause)
+
+
+class SessionSweeper(threading.Thread):
+    """Runs sweep() every `interval` seconds in the server process."""
+
+    def __init__(self, interval=SESSION_SWEEP_INTERVAL, batch_size=SESSION_SWEEP_BATCH,
+                 pause=SESSION_SWEEP_PAUSE):
+        super().__init__(name="session-sweeper", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._purged_total = 0
+        self._last = None
+
+    def run_once(self):
+        started = time.monotonic()
+        try:
+            purged, batches = sweep(self.batch_size, self.pause, self._stop_event)
+        except Exception as e:
+            log.error("Session sweep failed: %s", e)
+            return
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._runs += 1
+            self._purged_total += purged
+            self._last = {"purged": purged, "batches": batches, "seconds": round(elapsed, 3),
+                          "finished_at": time.time()}
+        log.info("Purged %d expired sessions in %d batches (%.2fs)", purged, batches, elapsed,
+                 extra={"purged": purged, "batches": batches, "seconds": round(elapsed, 3)})
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "batch_size": self.batch_size,
+                "runs": self._runs,
+                "purged_total": self._purged_total,
+                "last_run": self._last,
+            }
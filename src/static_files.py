@@ -0,0 +1,312 @@
+import os
+import gzip
+import mimetypes
+import posixpath
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote
+
+from cache import TTLCache, MISSING
+
+# Ensure common MIME types are registered on minimal Linux installs
+mimetypes.add_type('image/jpeg', '.jpg')
+mimetypes.add_type('image/jpeg', '.jpeg')
+mimetypes.add_type('image/png', '.png')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/gif', '.gif')
+mimetypes.add_type('image/svg+xml', '.svg')
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "86400"))       # Cache-Control max-age for assets
+STATIC_STAT_TTL = float(os.getenv("STATIC_STAT_TTL", "2"))        # how long a stat() result is trusted
+STATIC_STAT_CACHE_SIZE = int(os.getenv("STATIC_STAT_CACHE_SIZE", "4096"))
+STATIC_GZIP_CACHE_BYTES = int(os.getenv("STATIC_GZIP_CACHE_BYTES", str(16 * 1024 * 1024)))  # on-the-fly gzip cache
+
+COMPRESS_MIN_SIZE = 1024              # smaller bodies don't benefit from compression
+COMPRESS_MAX_SIZE = 5 * 1024 * 1024   # never gzip bigger files in-process
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json', 'application/xml',
+    'image/svg+xml', 'application/manifest+json'
+)
+# Content-addressed files (see images.py) never change under the same name
+IMMUTABLE_DIR = os.sep + os.path.join('images', 'derived') + os.sep
+# Preference order when the client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def is_compressible_type(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def is_compressible_path(path):
+    mime_type, _ = mimetypes.guess_type(path)
+    return bool(mime_type) and is_compressible_type(mime_type)
+
+
+class FileInfo:
+    __slots__ = ("path", "size", "mtime", "mtime_ns", "etag", "last_modified", "content_type",
+                 "cache_control", "compressible", "encoding", "body")
+
+    def __init__(self, path, st):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        self.mtime_ns = st.st_mtime_ns
+        self.etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+        self.encoding = None  # Content-Encoding of this representation
+        self.body = None      # in-memory body (on-the-fly compression); None means stream `path`
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        mime_type, file_encoding = mimetypes.guess_type(path)
+        if file_encoding:
+            # e.g. app.js.gz requested directly: don't label it as JavaScript
+            mime_type = None
+        self.content_type = mime_type or 'application/octet-stream'
+        self.compressible = is_compressible_type(self.content_type)
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        # HTML pages must be revalidated so deploys show up immediately; assets can be reused for a while
+        if path.endswith('.html'):
+            self.cache_control = 'no-cache'
+        elif IMMUTABLE_DIR in path:
+            self.cache_control = 'public, max-age=31536000, immutable'
+        else:
+            self.cache_control = 'public, max-age=%d' % STATIC_MAX_AGE
+
+    def copy(self):
+        clone = FileInfo.__new__(FileInfo)
+        for slot in FileInfo.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+    def encoded(self, encoding, size, etag_base=None, path=None, body=None):
+        """Copy of this resource describing an encoded representation of it."""
+        variant = self.copy()
+        variant.encoding = encoding
+        variant.size = size
+        variant.etag = (etag_base or self.etag)[:-1] + '-' + encoding + '"'
+        variant.path = path if path is not None else self.path
+        variant.body = body
+        return variant
+
+
+class CompressedCache:
+    """In-memory gzip bodies for files without a precompressed sibling, bounded by total bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # etag -> bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, info):
+        with self._lock:
+            body = self._data.get(info.etag)
+            if body is not None:
+                self._data.move_to_end(info.etag)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        with open(info.path, 'rb') as f:
+            body = gzip.compress(f.read(), compresslevel=6)
+        if len(body) > self.max_bytes:
+            return body
+
+        with self._lock:
+            if info.etag not in self._data:
+                self._data[info.etag] = body
+                self._bytes += len(body)
+                while self._bytes > self.max_bytes:
+                    _, old = self._data.popitem(last=False)
+                    self._bytes -= len(old)
+                    self.evictions += 1
+        return body
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def parse_accept_encoding(header):
+    """Return the set of content-codings the client accepts (q > 0)."""
+    accepted = set()
+    if not header:
+        return accepted
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class StaticFiles:
+    """Resolves URL paths under a root directory and caches their stat()/ETag data."""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self._cache = TTLCache(maxsize=STATIC_STAT_CACHE_SIZE, ttl=STATIC_STAT_TTL)
+        self._compressed = CompressedCache(STATIC_GZIP_CACHE_BYTES)
+
+    def resolve(self, url_path):
+        """Map a URL path to a file path inside root, or None if it escapes root."""
+        path = unquote(url_path)  # %C3%9C → Ü gibi Türkçe karakter çözümlemesi
+        if path in ('', '/'):
+            path = '/index.html'
+        path = posixpath.normpath(path).lstrip('/')
+        full_path = os.path.join(self.root, *path.split('/'))
+        if full_path != self.root and not full_path.startswith(self.root + os.sep):
+            return None
+        return full_path
+
+    def lookup(self, url_path):
+        """Return a FileInfo for a regular file, or None."""
+        info = self._cache.get(url_path)
+        if info is not MISSING:
+            return info
+
+        info = None
+        full_path = self.resolve(url_path)
+        if full_path:
+            try:
+                st = os.stat(full_path)
+                if os.path.isfile(full_path):
+                    info = FileInfo(full_path, st)
+            except OSError:
+                pass
+        self._cache.set(url_path, info)
+        return info
+
+    def negotiate(self, url_path, info, accept_encoding):
+        """Pick the representation to send for `info` given an Accept-Encoding header.
+
+        Precompressed siblings written by build_assets.py (`.br`, `.gz`) are
+        preferred; they are only used while at least as new as the source.
+        Otherwise gzip is produced on the fly and kept in a bounded cache.
+        """
+        if not info.compressible or info.size < COMPRESS_MIN_SIZE:
+            return info
+        accepted = parse_accept_encoding(accept_encoding)
+        if not accepted:
+            return info
+
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            sibling = self.lookup(url_path + suffix)
+            if sibling and sibling.mtime_ns >= info.mtime_ns:
+                return info.encoded(encoding, sibling.size, etag_base=sibling.etag, path=sibling.path)
+
+        if 'gzip' in accepted and info.size <= COMPRESS_MAX_SIZE:
+            body = self._compressed.get(info)
+            if len(body) < info.size:
+                return info.encoded('gzip', len(body), body=body)
+        return info
+
+    def stats(self):
+        return {"stat_cache": self._cache.stats(), "gzip_cache": self._compressed.stats()}
+
+
+def is_not_modified(headers, info):
+    """Evaluate If-None-Match / If-Modified-Since (RFC 9110 §13.2.2)."""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        tags = [t.strip() for t in if_none_match.split(',')]
+        # Weak comparison: W/"x" matches "x"
+        return any((t[2:] if t.startswith('W/') else t) == info.etag for t in tags)
+
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since is None:
+            return False
+        return info.mtime <= int(since.timestamp())
+    return False
+
+
+def parse_range(headers, info):
+    """Return None (serve the full body), an (start, end) inclusive byte range,
+    or False if the range is unsatisfiable. Multi-range requests get the full body."""
+    value = headers.get('Range')
+    if not value or not value.startswith('bytes='):
+        return None
+
+    if_range = headers.get('If-Range')
+    if if_range and if_range.strip() not in (info.etag, info.last_modified):
+        return None
+
+    spec = value[len('bytes='):].strip()
+    if ',' in spec:
+        return None
+    start, sep, end = spec.partition('-')
+    if not sep:
+        return None
+    try:
+        if start == '':
+            # Suffix range: last N bytes
+            length = int(end)
+            if length <= 0:
+                return False
+            return (max(info.size - length, 0), info.size - 1)
+        start = int(start)
+        end = int(end) if end else info.size - 1
+    except ValueError:
+        return None
+    if start >= info.size or start > end:
+        return False
+    return (start, min(end, info.size - 1))
+
+
+def send_body(sock, wfile, info, offset, count):
+    """Send `count` bytes of a representation, from memory or from disk."""
+    if info.body is not None:
+        wfile.write(info.body[offset:offset + count])
+        return count
+    return send_file(sock, wfile, info.path, offset, count)
+
+
+def send_file(sock, wfile, path, offset, count):
+    """Stream `count` bytes of `path` starting at `offset`.
+
+    socket.sendfile() uses os.sendfile() (zero-copy) where the platform
+    supports it; otherwise, or if the socket cannot use it, we copy in
+    fixed-size chunks so the file is never read fully into memory.
+    """
+    with open(path, 'rb') as f:
+        if count <= 0:
+            return 0
+        if hasattr(os, 'sendfile'):
+            try:
+                return sock.sendfile(f, offset, count)
+            except (AttributeError, NotImplementedError):
+                f.seek(offset)
+        else:
+            f.seek(offset)
+        remaining = count
+        while remaining > 0:
+            chunk = f.read(min(65536, remaining))
+            if not chunk:
+                break
+            wfile.write(chunk)
+            remaining -= len(chunk)
+        return count - remaining
@@ -0,0 +1,22 @@
+import re
+
+# Turkish letters -> ASCII. Keep in sync with vetaris_fold() in migrations/0005_search.sql
+FOLD = str.maketrans("ÇĞİIÖŞÜÂÎÛçğıöşüâîû", "cgiiosuaiucgiosuaiu")
+
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_TERM_RE = re.compile(r"[^\W_]+")
+
+
+def fold(text):
+    """Lowercase ASCII-ish form of Turkish text: "Köpek Maması" -> "kopek mamasi"."""
+    return text.translate(FOLD).lower()
+
+
+def slugify(text, fallback="yazi"):
+    """URL slug: folded, runs of anything else collapsed to '-'."""
+    return _NON_SLUG_RE.sub("-", fold(text or "")).strip("-") or fallback
+
+
+def search_terms(query, max_terms=8):
+    """Words of a search box query (punctuation dropped), at most `max_terms`."""
+    return _TERM_RE.findall(query or "")[:max_terms]
@@ -0,0 +1,116 @@
+import os
+import json
+import queue
+import threading
+import time
+
+import metrics
+
+HTTP_THREADS = int(os.getenv("HTTP_THREADS", "16"))        # concurrent requests per process
+HTTP_QUEUE_SIZE = int(os.getenv("HTTP_QUEUE_SIZE", "64"))  # accepted connections waiting for a thread
+HTTP_RETRY_AFTER = int(os.getenv("HTTP_RETRY_AFTER", "1"))  # seconds, sent with the 503
+
+
+class BoundedThreadPoolMixIn:
+    """socketserver mix-in: a fixed set of worker threads fed by a bounded queue.
+
+    Replaces ThreadingMixIn's thread-per-connection. When the queue is full
+    the accept loop answers 503 + Retry-After right away instead of piling
+    up threads (and database connections).
+    """
+
+    pool_size = HTTP_THREADS
+    queue_size = HTTP_QUEUE_SIZE
+
+    def __init__(self, *args, **kwargs):
+        self._threads = []  # server_close() runs from TCPServer.__init__ if bind fails
+        super().__init__(*args, **kwargs)
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._processed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        for i in range(self.pool_size):
+            t = threading.Thread(target=self._work, name=f"http-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def process_request(self, request, client_address):
+        try:
+            self._queue.put_nowait((request, client_address, time.monotonic()))
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            metrics.HTTP_REJECTED.inc()
+            self.reject_request(request)
+            self.shutdown_request(request)
+
+    def reject_request(self, request):
+        """Fast 503 written from the accept thread; never blocks for long."""
+        body = json.dumps({"error": "Server busy, please retry"}).encode('utf-8')
+        head = (
+            "HTTP/1.1 503 Service Unavailable\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Retry-After: {HTTP_RETRY_AFTER}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode('ascii')
+        try:
+            request.setblocking(False)
+            try:
+                # Drain what the client already sent so close() doesn't turn into a reset
+                request.recv(65536)
+            except OSError:
+                pass
+            request.settimeout(0.05)
+            request.sendall(head + body)
+        except OSError:
+            pass
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            request, client_address, queued_at = item
+            waited = time.monotonic() - queued_at
+            with self._stats_lock:
+                self._active += 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                with self._stats_lock:
+                    self._active -= 1
+                    self._processed += 1
+
+    def server_close(self):
+        super().server_close()
+        # Queued connections are served first; then each thread picks up one stop marker
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for t in threads:
+            t.join()
+
+    def pool_stats(self):
+        with self._stats_lock:
+            started = self._processed + self._active
+            return {
+                "threads": self.pool_size,
+                "active": self._active,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "processed": self._processed,
+                "rejected": self._rejected,
+                "wait_time_total": round(self._wait_total, 6),
+                "wait_time_max": round(self._wait_max, 6),
+                "wait_time_avg": round(self._wait_total / started, 6) if started else 0.0,
+            }
@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+import argparse
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+import session_sweeper
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired sessions in small batches")
+    parser.add_argument('--batch-size', type=int, default=session_sweeper.SESSION_SWEEP_BATCH,
+                        help="rows deleted per statement")
+    parser.add_argument('--pause', type=float, default=session_sweeper.SESSION_SWEEP_PAUSE,
+                        help="seconds to sleep between batches")
+    parser.add_argument('--loop', action='store_true',
+                        help="keep running, sweeping every --interval seconds")
+    parser.add_argument('--interval', type=float, default=session_sweeper.SESSION_SWEEP_INTERVAL)
+    args = parser.parse_args()
+
+    print("--- Expired session sweep ---")
+    while True:
+        started = time.monotonic()
+        try:
+            purged, batches = session_sweeper.sweep(args.batch_size, args.pause)
+        except Exception as e:
+            print(f"❌ Sweep failed: {e}")
+            if not args.loop:
+                sys.exit(1)
+        else:
+            print(f"🧹 Purged {purged} expired sessions in {batches} batches ({time.monotonic() - started:.2f}s)")
+        if not args.loop:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass